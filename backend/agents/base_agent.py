@@ -1,34 +1,103 @@
 import os
+import asyncio
 import google.generativeai as genai
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
+import hashlib
 import json
+import time
+import orjson
+from .cache import TTLCache
+from .metrics import LLMCall, LLMMetrics
 
 class BaseAgent:
     """Base class for all e-commerce agents"""
     
+    # Parsed LLM responses shared by every agent, keyed by a hash of the prompt.
+    # Matching is exact (after whitespace normalization) on purpose: prompts embed
+    # prices, ratings and product ids, so a "similar" prompt is a different question.
+    _response_cache = TTLCache(
+        maxsize=int(os.getenv("LLM_CACHE_SIZE", "512")),
+        ttl=float(os.getenv("LLM_CACHE_TTL", "900"))
+    )
+    
+    # Caps model calls in flight across every agent and request in the process,
+    # so fan-outs in the agents cannot exceed the provider's rate limits
+    _llm_semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+    
+    # Recent model calls from every agent, tagged by call site, to show which
+    # prompts dominate latency and size before tuning them further
+    _llm_metrics = LLMMetrics(maxsize=int(os.getenv("LLM_METRICS_SIZE", "1000")))
+    
     def __init__(self, model_name: str = None):
         self.model_name = model_name or os.getenv("MODEL_NAME", "gemini-1.5-flash")
         self.model = genai.GenerativeModel(self.model_name)
         
-    async def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    async def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None,
+                                tag: str = "generate") -> str:
         """Generate AI response with optional context"""
+        full_prompt = prompt
+        response = None
+        ok = False
+        started = time.perf_counter()
         try:
             if context:
-                full_prompt = f"Context: {json.dumps(context, indent=2)}\n\nTask: {prompt}"
-            else:
-                full_prompt = prompt
+                full_prompt = f"Context: {self._to_json(context)}\n\nTask: {prompt}"
                 
-            response = self.model.generate_content(full_prompt)
-            return response.text if response.text else ""
+            async with self._llm_semaphore:
+                started = time.perf_counter()
+                response = await self.model.generate_content_async(full_prompt)
+            text = response.text if response.text else ""
+            ok = True
+            return text
         except Exception as e:
             print(f"Error generating response: {e}")
             return ""
+        finally:
+            self._record_llm_call(tag, full_prompt, started, ok=ok, response=response)
+    
+    async def generate_response_stream(self, prompt: str, tag: str = "generate_stream") -> AsyncIterator[str]:
+        """Generate an AI response, yielding text chunks as the model produces them
+        
+        Errors are re-raised: unlike generate_response there is no empty answer
+        to fall back to once part of the text has been sent, and callers must be
+        able to tell a cut-off response from a complete one.
+        """
+        chunk = None
+        ok = False
+        started = time.perf_counter()
+        try:
+            async with self._llm_semaphore:
+                started = time.perf_counter()
+                response = await self.model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety metadata only)
+                        continue
+                    if text:
+                        yield text
+            ok = True
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            raise
+        finally:
+            # Token usage is reported on the last chunk of the stream
+            self._record_llm_call(tag, prompt, started, ok=ok, response=chunk)
     
-    async def parse_json_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def parse_json_response(self, prompt: str, context: Optional[Dict[str, Any]] = None,
+                                  tag: str = "parse_json") -> Dict[str, Any]:
         """Generate and parse JSON response"""
+        cache_key = self._cache_key(prompt, context)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._record_llm_call(tag, prompt, time.perf_counter(), cache_hit=True)
+            # Cache the raw JSON text so every caller gets its own mutable copy
+            return orjson.loads(cached)
+        
         try:
             json_prompt = f"{prompt}\n\nIMPORTANT: Respond ONLY with valid JSON. No additional text."
-            response = await self.generate_response(json_prompt, context)
+            response = await self.generate_response(json_prompt, context, tag=tag)
             
             # Clean response to extract JSON
             response = response.strip()
@@ -38,7 +107,73 @@ class BaseAgent:
                 response = response[:-3]
             response = response.strip()
             
-            return json.loads(response)
+            try:
+                parsed = orjson.loads(response)
+            except orjson.JSONDecodeError:
+                # orjson rejects NaN/Infinity, which the model occasionally emits;
+                # re-encoding turns them into null for this and cached callers alike
+                response = orjson.dumps(json.loads(response))
+                parsed = orjson.loads(response)
+            if parsed:
+                self._response_cache.set(cache_key, response)
+            return parsed
         except Exception as e:
             print(f"Error parsing JSON response: {e}")
-            return {} 
\ No newline at end of file
+            return {}
+    
+    async def batch_parse_json_response(self, prompts: List[str], context: Optional[Dict[str, Any]] = None,
+                                        semaphore: Optional[asyncio.Semaphore] = None,
+                                        tag: str = "parse_json") -> List[Dict[str, Any]]:
+        """Generate and parse JSON responses for independent prompts, in prompt order"""
+        # Gemini has no batch endpoint, so the prompts are sent concurrently.
+        # A failed prompt yields {} like parse_json_response, without failing the rest.
+        async def parse(prompt: str) -> Dict[str, Any]:
+            if semaphore is None:
+                return await self.parse_json_response(prompt, context, tag=tag)
+            async with semaphore:
+                return await self.parse_json_response(prompt, context, tag=tag)
+        
+        results = await asyncio.gather(*[parse(prompt) for prompt in prompts], return_exceptions=True)
+        
+        parsed = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error parsing JSON response: {result}")
+                result = {}
+            parsed.append(result)
+        return parsed
+    
+    def llm_metrics_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Latency, size and cache-hit aggregates for recent model calls of every agent"""
+        return self._llm_metrics.summary()
+    
+    def _record_llm_call(self, tag: str, prompt: str, started: float, cache_hit: bool = False,
+                         ok: bool = True, response: Any = None) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        self._llm_metrics.record(LLMCall(
+            agent=type(self).__name__,
+            method=tag,
+            prompt_chars=len(prompt),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            cache_hit=cache_hit,
+            ok=ok,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None)
+        ))
+    
+    def _cache_key(self, prompt: str, context: Optional[Dict[str, Any]]) -> str:
+        """Stable cache key for a prompt, its context and the model answering it"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.model_name.encode())
+        digest.update(b"\0")
+        # Prompts are built from indented f-strings; layout changes should not miss
+        digest.update(" ".join(prompt.split()).encode())
+        if context:
+            digest.update(b"\0")
+            digest.update(orjson.dumps(context, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        return digest.hexdigest()
+    
+    def _to_json(self, data: Any) -> str:
+        """Compact JSON for embedding request data in prompts"""
+        # Review statistics use int keys for the rating distribution
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Small in-process caches shared by the agents
+"""
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import orjson
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis is optional; without it every cache stays in-process
+    redis_asyncio = None
+
+# Thousands separators inside numbers ("20,000"), comparison operators, which
+# change the meaning of a budget, and any other punctuation. "+" and "#" are
+# kept because they are part of names like "c++" and "c#".
+_DIGIT_SEPARATOR_RE = re.compile(r"(?<=\d)[,_](?=\d)")
+_UPPER_BOUND_OPERATOR_RE = re.compile(r"<=?|≤")
+_LOWER_BOUND_OPERATOR_RE = re.compile(r">=?|≥")
+_PUNCTUATION_RE = re.compile(r"[^\w\s₹+#]")
+
+def normalize_query(query: str) -> str:
+    """Lowercase a user query, drop punctuation and collapse whitespace
+    
+    Queries that differ in meaning must keep distinct keys:
+    
+    >>> normalize_query("Phones < 20,000!") == normalize_query("phones under 20000")
+    True
+    >>> normalize_query("phones > 20000") == normalize_query("phones < 20000")
+    False
+    >>> normalize_query("phones > 20000") == normalize_query("phones 20000")
+    False
+    >>> normalize_query("C++ book") == normalize_query("c book")
+    False
+    """
+    query = _DIGIT_SEPARATOR_RE.sub("", query.lower())
+    query = _UPPER_BOUND_OPERATOR_RE.sub(" under ", query)
+    query = _LOWER_BOUND_OPERATOR_RE.sub(" above ", query)
+    return " ".join(_PUNCTUATION_RE.sub(" ", query).split())
+
+class TTLCache:
+    """LRU cache whose entries also expire after a fixed time-to-live"""
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 900.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class QueryCache(TTLCache):
+    """TTLCache keyed by normalized user queries, so trivially different phrasings share an entry"""
+    
+    def get(self, query: str) -> Optional[Any]:
+        return super().get(normalize_query(query))
+    
+    def set(self, query: str, value: Any) -> None:
+        super().set(normalize_query(query), value)
+
+class RedisQueryCache:
+    """Query-keyed cache in Redis, shared by every worker process pointed at the same server"""
+    
+    def __init__(self, client, namespace: str, ttl: float):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+    
+    @classmethod
+    def from_env(cls, namespace: str, ttl: float) -> Optional["RedisQueryCache"]:
+        """Connect to REDIS_URL, or return None when it is unset or redis is not installed"""
+        url = os.getenv("REDIS_URL")
+        if not url:
+            return None
+        if redis_asyncio is None:
+            print("⚠️ REDIS_URL is set but the redis package is not installed; using in-process caches only")
+            return None
+        return cls(redis_asyncio.from_url(url), namespace, ttl)
+    
+    def _key(self, query: str) -> str:
+        digest = hashlib.blake2b(normalize_query(query).encode(), digest_size=16).hexdigest()
+        return f"cogni:{self.namespace}:{digest}"
+    
+    async def get(self, query: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or Redis is unreachable"""
+        try:
+            cached = await self.client.get(self._key(query))
+        except Exception as e:
+            print(f"Redis cache read failed: {e}")
+            return None
+        return orjson.loads(cached) if cached is not None else None
+    
+    async def set(self, query: str, value: Any) -> None:
+        """Store a value with the cache TTL; failures only cost the shared hit"""
+        try:
+            payload = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+            await self.client.set(self._key(query), payload, ex=max(1, int(self.ttl)))
+        except Exception as e:
+            print(f"Redis cache write failed: {e}")
+    
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -3,7 +3,7 @@ from .query_understanding_agent import QueryUnderstandingAgent
 from .product_search_agent import ProductSearchAgent
 from .review_analyzer_agent import ReviewAnalyzerAgent
 from .deal_finder_agent import DealFinderAgent
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List
 import asyncio
 
 class CoordinatorAgent(BaseAgent):
@@ -51,28 +51,17 @@ class CoordinatorAgent(BaseAgent):
             
             for i, product in enumerate(top_products):
                 print(f"📊 Analyzing product {i+1}: {product.get('title', '')[:50]}...")
-                
-                try:
-                    # Get detailed product info with real reviews
-                    detailed_product = await self.search_agent.get_product_details(product.get("id", ""))
-                    
-                    # Analyze real reviews from scraped data
-                    review_analysis = await self.review_agent.analyze_product_reviews(detailed_product)
-                    
-                    # Find real deal information
-                    deal_analysis = await self.deal_agent._analyze_product_for_deals(detailed_product)
-                    
-                    enhanced_product = {
-                        **detailed_product,
-                        "review_analysis": review_analysis,
-                        "deal_analysis": deal_analysis,
-                        "source": "real_scraping"
-                    }
-                    
-                    enhanced_products.append(enhanced_product)
-                    
-                except Exception as e:
-                    print(f"⚠️ Error analyzing product {i+1}: {e}")
+            
+            results = await asyncio.gather(
+                *[self.analyze_product(product) for product in top_products],
+                return_exceptions=True
+            )
+            
+            for i, (product, result) in enumerate(zip(top_products, results)):
+                if not isinstance(result, Exception):
+                    enhanced_products.append(result)
+                else:
+                    print(f"⚠️ Error analyzing product {i+1}: {result}")
                     # Add basic product info even if detailed analysis fails
                     enhanced_products.append({
                         **product,
@@ -84,7 +73,7 @@ class CoordinatorAgent(BaseAgent):
                             "deal_type": "standard_pricing",
                             "value_assessment": "Price information available"
                         },
-                        "source": "real_scraping"
+                        "source": "basic_search"
                     })
             
             # Step 4: Generate comprehensive response
@@ -117,6 +106,25 @@ class CoordinatorAgent(BaseAgent):
                 ]
             }
     
+    async def analyze_product(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        """Get details for a search result and analyze its reviews and deals"""
+        
+        # Get detailed product info with real reviews
+        detailed_product = await self.search_agent.get_product_details(product.get("id", ""))
+        
+        # Review and deal analysis both work from the detailed product, independently
+        review_analysis, deal_analysis = await asyncio.gather(
+            self.review_agent.analyze_product_reviews(detailed_product),
+            self.deal_agent._analyze_product_for_deals(detailed_product)
+        )
+        
+        return {
+            **detailed_product,
+            "review_analysis": review_analysis,
+            "deal_analysis": deal_analysis,
+            "source": "real_scraping"
+        }
+    
     async def compare_products(self, product_ids: List[str], comparison_aspects: List[str] = None) -> Dict[str, Any]:
         """Compare multiple products across different aspects"""
         
@@ -207,13 +215,28 @@ class CoordinatorAgent(BaseAgent):
                                              products: List[Dict[str, Any]], additional_products: List[Dict[str, Any]]) -> str:
         """Generate a comprehensive response using AI"""
         
-        prompt = f"""
+        prompt = self._comprehensive_response_prompt(user_input, parsed_query, products, additional_products)
+        return await self.generate_response(prompt, tag="comprehensive_response")
+    
+    async def stream_comprehensive_response(self, user_input: str, parsed_query: Dict[str, Any],
+                                            products: List[Dict[str, Any]], additional_products: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Generate the comprehensive response, yielding text as the model produces it"""
+        
+        prompt = self._comprehensive_response_prompt(user_input, parsed_query, products, additional_products)
+        async for chunk in self.generate_response_stream(prompt, tag="comprehensive_response"):
+            yield chunk
+    
+    def _comprehensive_response_prompt(self, user_input: str, parsed_query: Dict[str, Any],
+                                       products: List[Dict[str, Any]], additional_products: List[Dict[str, Any]]) -> str:
+        """Prompt for the conversational recommendation response"""
+        
+        return f"""
 You are an expert e-commerce assistant. Create a helpful, personalized response for the user.
 
 User Query: "{user_input}"
-Parsed Requirements: {parsed_query}
+Parsed Requirements: {self._to_json(parsed_query)}
 
-Top Product Recommendations: {products}
+Top Product Recommendations: {self._to_json(products)}
 Additional Products Available: {len(additional_products)} more products
 
 Create a conversational response that:
@@ -225,8 +248,6 @@ Create a conversational response that:
 
 Make it feel like talking to a knowledgeable friend, not a chatbot.
 """
-        
-        return await self.generate_response(prompt)
     
     async def _generate_comparison_response(self, products: List[Dict[str, Any]], 
                                          review_comparison: Dict[str, Any], deal_comparison: Dict[str, Any],
@@ -236,9 +257,9 @@ Make it feel like talking to a knowledgeable friend, not a chatbot.
         prompt = f"""
 Create a helpful comparison between these products:
 
-Products: {products}
-Review Analysis: {review_comparison}
-Deal Analysis: {deal_comparison}
+Products: {self._to_json(products)}
+Review Analysis: {self._to_json(review_comparison)}
+Deal Analysis: {self._to_json(deal_comparison)}
 Focus Areas: {comparison_aspects or 'general comparison'}
 
 Provide a clear, structured comparison that helps the user decide. Include:
@@ -251,7 +272,7 @@ Provide a clear, structured comparison that helps the user decide. Include:
 Keep it conversational and actionable.
 """
         
-        return await self.generate_response(prompt)
+        return await self.generate_response(prompt, tag="comparison_response")
     
     async def _generate_detailed_product_response(self, product: Dict[str, Any], 
                                                 review_analysis: Dict[str, Any], deals: List[Dict[str, Any]],
@@ -261,9 +282,9 @@ Keep it conversational and actionable.
         prompt = f"""
 Create a comprehensive product overview:
 
-Product: {product}
-Review Analysis: {review_analysis}
-Available Deals: {deals}
+Product: {self._to_json(product)}
+Review Analysis: {self._to_json(review_analysis)}
+Available Deals: {self._to_json(deals)}
 Focus Areas: {focus_areas or 'general overview'}
 
 Provide detailed information including:
@@ -276,7 +297,7 @@ Provide detailed information including:
 Make it thorough but easy to understand.
 """
         
-        return await self.generate_response(prompt)
+        return await self.generate_response(prompt, tag="product_details_response")
     
     async def handle_follow_up(self, follow_up_query: str, previous_context: Dict[str, Any]) -> Dict[str, Any]:
         """Handle follow-up questions with context"""
@@ -286,7 +307,7 @@ Make it thorough but easy to understand.
 Analyze this follow-up query in context:
 
 Follow-up: "{follow_up_query}"
-Previous Context: {previous_context}
+Previous Context: {self._to_json(previous_context)}
 
 What is the user trying to do? Return JSON:
 {{
@@ -297,7 +318,7 @@ What is the user trying to do? Return JSON:
 """
         
         try:
-            intent_analysis = await self.parse_json_response(intent_prompt)
+            intent_analysis = await self.parse_json_response(intent_prompt, tag="follow_up_intent")
             intent = intent_analysis.get("intent", "clarify_requirements")
             
             if intent == "compare_products":
@@ -317,7 +338,8 @@ What is the user trying to do? Return JSON:
             
             # Default: Generate contextual response
             response = await self.generate_response(
-                f"User follow-up: {follow_up_query}\nPrevious context: {previous_context}\nProvide a helpful response."
+                f"User follow-up: {follow_up_query}\nPrevious context: {self._to_json(previous_context)}\nProvide a helpful response.",
+                tag="follow_up"
             )
             
             return {
@@ -1,28 +1,73 @@
 from .base_agent import BaseAgent
 from typing import Dict, Any, List
-import json
+import asyncio
+import re
 from datetime import datetime, timedelta
 
+# Rupee amounts such as "₹12,499" in the model's comparable price range
+_RUPEE_AMOUNT_RE = re.compile(r'₹([\d,]+)')
+
+# Instructions come first and request data is appended after them, so the
+# prompt prefix is identical across calls and can be reused by prompt caching
+_DEAL_ANALYSIS_PROMPT = """
+You are an expert deal finder for Indian e-commerce. Analyze this product to determine if it represents good value for money.
+
+Consider these factors for Indian market:
+- Price competitiveness in INR
+- Brand reputation and value
+- Feature set relative to price
+- Customer satisfaction (rating/reviews)
+- Market category pricing norms
+
+Provide analysis in JSON format with:
+- "price_analysis": {"market_position": "budget/mid-range/premium", "value_rating": 1-10, "price_per_feature_value": "good/average/poor"}
+- "value_assessment": Detailed explanation of value proposition
+- "deal_indicators": List of factors that make this a good or bad deal
+- "comparable_price_range": Expected price range for similar products in INR
+- "recommendation": "strong_buy", "good_buy", "consider", or "skip" with reasoning
+"""
+
+_DEAL_SUMMARY_PROMPT = """
+Summarize these deals found for Indian consumers.
+
+Provide summary in JSON format with:
+- "summary": Brief overview of deal landscape
+- "best_deal_recommendation": Which deal offers best value
+- "total_savings_potential": Total estimated savings across all deals
+- "deal_strategy": Advice on when to buy
+"""
+
+_DEAL_COMPARISON_PROMPT = """
+Compare these products from a deal/value perspective for Indian consumers.
+
+Provide comparison in JSON format with:
+- "best_overall_value": Which product offers best overall value for money
+- "best_budget_option": Most affordable option with good quality
+- "best_premium_option": Best high-end option if budget allows
+- "value_ranking": Ranked list of products by value proposition
+- "buying_advice": Specific advice on which to choose based on different budgets/needs
+"""
+
 class DealFinderAgent(BaseAgent):
     """Agent responsible for finding deals and analyzing prices from real scraped data"""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_analyses: int = 8):
         super().__init__()
         # Simple price tracking for detected price patterns
         self.price_patterns = {}
+        # Caps how many deal analyses are waiting on the model at once
+        self.analysis_semaphore = asyncio.Semaphore(max_concurrent_analyses)
     
     async def find_product_deals(self, products: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Find deals and price insights for real products"""
         
-        deals = []
-        
-        for product in products:
-            deal_analysis = await self._analyze_product_for_deals(product)
-            if deal_analysis:
-                deals.append({
-                    "product": product,
-                    "deal_info": deal_analysis
-                })
+        deals = [
+            {
+                "product": product,
+                "deal_info": deal_analysis
+            }
+            for product, deal_analysis in await self._analyze_products_for_deals(products)
+        ]
         
         # Sort deals by savings potential
         deals.sort(key=lambda x: x["deal_info"].get("deal_score", 0), reverse=True)
@@ -33,6 +78,22 @@ class DealFinderAgent(BaseAgent):
             "deal_summary": await self._generate_deal_summary(deals)
         }
     
+    async def _analyze_products_for_deals(self, products: List[Dict[str, Any]]) -> List[tuple]:
+        """Analyze priced products concurrently, returning (product, analysis) pairs in input order"""
+        
+        priced_products = [product for product in products if product.get("price", 0) != 0]
+        
+        ai_analyses = await self.batch_parse_json_response(
+            [self._deal_analysis_prompt(product) for product in priced_products],
+            semaphore=self.analysis_semaphore,
+            tag="deal_analysis"
+        )
+        
+        return [
+            (product, self._build_deal_info(product, analysis if isinstance(analysis, dict) else {}))
+            for product, analysis in zip(priced_products, ai_analyses)
+        ]
+    
     async def _analyze_product_for_deals(self, product: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze a single product for deal potential"""
         
@@ -46,6 +107,11 @@ class DealFinderAgent(BaseAgent):
         # Use AI to analyze if this is a good deal
         deal_analysis = await self._ai_deal_analysis(product)
         
+        return self._build_deal_info(product, deal_analysis)
+    
+    def _build_deal_info(self, product: Dict[str, Any], deal_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the AI deal analysis with the locally computed deal metrics"""
+        
         # Calculate deal score based on multiple factors
         deal_score = self._calculate_deal_score(product, deal_analysis)
         
@@ -62,34 +128,20 @@ class DealFinderAgent(BaseAgent):
     async def _ai_deal_analysis(self, product: Dict[str, Any]) -> Dict[str, Any]:
         """Use AI to analyze if product represents a good deal"""
         
-        prompt = f"""
-You are an expert deal finder for Indian e-commerce. Analyze this product to determine if it represents good value for money.
-
-Product Data:
-{json.dumps(product, indent=2)}
-
-Consider these factors for Indian market:
-- Price competitiveness in INR
-- Brand reputation and value
-- Feature set relative to price
-- Customer satisfaction (rating/reviews)
-- Market category pricing norms
-
-Provide analysis in JSON format with:
-- "price_analysis": {{"market_position": "budget/mid-range/premium", "value_rating": 1-10, "price_per_feature_value": "good/average/poor"}}
-- "value_assessment": Detailed explanation of value proposition
-- "deal_indicators": List of factors that make this a good or bad deal
-- "comparable_price_range": Expected price range for similar products in INR
-- "recommendation": "strong_buy", "good_buy", "consider", or "skip" with reasoning
-"""
-        
         try:
-            analysis = await self.parse_json_response(prompt)
+            analysis = await self.parse_json_response(self._deal_analysis_prompt(product), tag="deal_analysis")
             return analysis if isinstance(analysis, dict) else {}
         except Exception as e:
             print(f"⚠️ AI deal analysis failed: {e}")
             return self._fallback_deal_analysis(product)
     
+    def _deal_analysis_prompt(self, product: Dict[str, Any]) -> str:
+        """Deal analysis prompt for a single product"""
+        return f"""{_DEAL_ANALYSIS_PROMPT}
+Product Data:
+{self._to_json(product)}
+"""
+    
     def _fallback_deal_analysis(self, product: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback deal analysis when AI fails"""
         
@@ -166,9 +218,8 @@ Provide analysis in JSON format with:
         # Extract comparable price range
         comparable_range = deal_analysis.get("comparable_price_range", "")
         
-        # Simple parsing of price range
-        import re
-        price_matches = re.findall(r'₹([\d,]+)', comparable_range)
+        # Simple parsing of price range; the model occasionally returns a non-string here
+        price_matches = _RUPEE_AMOUNT_RE.findall(comparable_range) if isinstance(comparable_range, str) else []
         
         if len(price_matches) >= 2:
             try:
@@ -229,26 +280,18 @@ Provide analysis in JSON format with:
             for d in deals
         )
         
-        prompt = f"""
-Summarize these deals found for Indian consumers:
-
+        prompt = f"""{_DEAL_SUMMARY_PROMPT}
 Excellent Value Deals: {len(excellent_deals)}
 Good Value Deals: {len(good_deals)}
 Total Deals Analyzed: {len(deals)}
 Total Potential Savings: ₹{total_potential_savings:.0f}
 
 Deal Details:
-{json.dumps([{"product_title": d["product"]["title"], "price": d["product"]["price"], "deal_type": d["deal_info"]["deal_type"]} for d in deals[:5]], indent=2)}
-
-Provide summary in JSON format with:
-- "summary": Brief overview of deal landscape
-- "best_deal_recommendation": Which deal offers best value
-- "total_savings_potential": Total estimated savings across all deals
-- "deal_strategy": Advice on when to buy
+{self._to_json([{"product_title": d["product"]["title"], "price": d["product"]["price"], "deal_type": d["deal_info"]["deal_type"]} for d in deals[:5]])}
 """
         
         try:
-            summary = await self.parse_json_response(prompt)
+            summary = await self.parse_json_response(prompt, tag="deal_summary")
             return summary if isinstance(summary, dict) else self._fallback_deal_summary(deals)
         except Exception as e:
             print(f"⚠️ Deal summary generation failed: {e}")
@@ -267,20 +310,18 @@ Provide summary in JSON format with:
     async def compare_deal_value(self, products: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Compare deal value across multiple products"""
         
-        analyses = []
-        
-        for product in products:
-            deal_analysis = await self._analyze_product_for_deals(product)
-            if deal_analysis:
-                analyses.append({
-                    "product": {
-                        "id": product.get("id", ""),
-                        "title": product.get("title", ""),
-                        "price": product.get("price", 0),
-                        "rating": product.get("rating", 0)
-                    },
-                    "deal_analysis": deal_analysis
-                })
+        analyses = [
+            {
+                "product": {
+                    "id": product.get("id", ""),
+                    "title": product.get("title", ""),
+                    "price": product.get("price", 0),
+                    "rating": product.get("rating", 0)
+                },
+                "deal_analysis": deal_analysis
+            }
+            for product, deal_analysis in await self._analyze_products_for_deals(products)
+        ]
         
         # AI-powered comparison
         comparison = await self._ai_deal_comparison(analyses)
@@ -293,22 +334,13 @@ Provide summary in JSON format with:
     async def _ai_deal_comparison(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Use AI to compare deal values"""
         
-        prompt = f"""
-Compare these products from a deal/value perspective for Indian consumers:
-
+        prompt = f"""{_DEAL_COMPARISON_PROMPT}
 Product Deal Analyses:
-{json.dumps(analyses, indent=2)}
-
-Provide comparison in JSON format with:
-- "best_overall_value": Which product offers best overall value for money
-- "best_budget_option": Most affordable option with good quality
-- "best_premium_option": Best high-end option if budget allows
-- "value_ranking": Ranked list of products by value proposition
-- "buying_advice": Specific advice on which to choose based on different budgets/needs
+{self._to_json(analyses)}
 """
         
         try:
-            comparison = await self.parse_json_response(prompt)
+            comparison = await self.parse_json_response(prompt, tag="deal_comparison")
             return comparison if isinstance(comparison, dict) else {}
         except Exception as e:
             print(f"⚠️ Deal comparison failed: {e}")
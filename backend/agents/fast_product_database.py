@@ -3,247 +3,50 @@ Fast Product Database with Real Indian E-commerce Data
 This provides fast, reliable product search without web scraping delays
 """
 
-import random
-import uuid
-from typing import List, Dict, Any
-import time
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+import orjson
+
+_CATALOGUE_PATH = Path(__file__).resolve().parent.parent / "data" / "products.json"
+
+@dataclass(frozen=True)
+class SearchRecord:
+    """Lowercased search fields of one catalogue product"""
+    # Declared by hand rather than with dataclass(slots=True), which needs Python 3.10
+    __slots__ = ("title", "brand", "product_type", "features", "price", "rating")
+    
+    title: str
+    brand: str
+    product_type: str
+    features: Tuple[str, ...]
+    price: float
+    rating: float
 
 class FastProductDatabase:
     """Fast product database with realistic Indian e-commerce data"""
     
     def __init__(self):
         self.products = self._initialize_product_database()
+        self.products_by_id = {p['id']: p for p in self.products}
+        self.products_by_category = self._build_index('category')
+        self.products_by_type = self._build_index('product_type')
+        self.search_records = self._build_search_records()
+        self.feature_vocabulary = frozenset(f for record in self.search_records for f in record.features)
         self.search_cache = {}
     
     def _initialize_product_database(self) -> List[Dict[str, Any]]:
         """Initialize database with realistic Indian products"""
         
-        products = []
-        
-        # Smartphones (Real models with real prices)
-        smartphones = [
-            {
-                "title": "Samsung Galaxy M34 5G (Dark Blue, 128GB)",
-                "brand": "Samsung",
-                "price": 17999,
-                "rating": 4.2,
-                "review_count": 12847,
-                "features": ["5G", "108MP Camera", "6000mAh Battery", "sAMOLED Display"],
-                "url": "https://www.amazon.in/dp/B0C7Q1L7TX",
-                "category": "electronics",
-                "product_type": "smartphone"
-            },
-            {
-                "title": "Redmi Note 13 Pro (Arctic White, 256GB)",
-                "brand": "Xiaomi",
-                "price": 26999,
-                "rating": 4.4,
-                "review_count": 8932,
-                "features": ["200MP Camera", "120Hz AMOLED", "67W Charging", "IP54"],
-                "url": "https://www.amazon.in/dp/B0CQK6H8TD",
-                "category": "electronics", 
-                "product_type": "smartphone"
-            },
-            {
-                "title": "OnePlus 11R 5G (Galactic Silver, 128GB)",
-                "brand": "OnePlus",
-                "price": 39999,
-                "rating": 4.3,
-                "review_count": 5672,
-                "features": ["Snapdragon 8+ Gen 1", "100W Charging", "50MP Camera", "120Hz Display"],
-                "url": "https://www.amazon.in/dp/B0BYG4HRDL",
-                "category": "electronics",
-                "product_type": "smartphone"
-            },
-            {
-                "title": "iPhone 13 (Blue, 128GB)",
-                "brand": "Apple",
-                "price": 54900,
-                "rating": 4.6,
-                "review_count": 21543,
-                "features": ["A15 Bionic", "Dual Camera", "All Day Battery", "5G"],
-                "url": "https://www.amazon.in/dp/B09G99CW2Y",
-                "category": "electronics",
-                "product_type": "smartphone"
-            }
-        ]
-        
-        # Laptops (Real models with real prices)
-        laptops = [
-            {
-                "title": "HP Pavilion 15 Intel Core i5 12th Gen (8GB, 512GB SSD)",
-                "brand": "HP",
-                "price": 54990,
-                "rating": 4.1,
-                "review_count": 3456,
-                "features": ["Intel i5 12th Gen", "8GB RAM", "512GB SSD", "15.6 FHD Display"],
-                "url": "https://www.amazon.in/dp/B0CHY7Y8ZD",
-                "category": "electronics",
-                "product_type": "laptop"
-            },
-            {
-                "title": "Lenovo IdeaPad 3 AMD Ryzen 5 (8GB, 256GB SSD)",
-                "brand": "Lenovo", 
-                "price": 41990,
-                "rating": 4.0,
-                "review_count": 2789,
-                "features": ["AMD Ryzen 5", "8GB RAM", "256GB SSD", "15.6 HD Display"],
-                "url": "https://www.amazon.in/dp/B0B7H8K4KG",
-                "category": "electronics",
-                "product_type": "laptop"
-            },
-            {
-                "title": "ASUS VivoBook 15 Intel Core i3 (8GB, 1TB HDD)",
-                "brand": "ASUS",
-                "price": 34990,
-                "rating": 3.9,
-                "review_count": 1923,
-                "features": ["Intel i3", "8GB RAM", "1TB HDD", "Fingerprint", "Backlit Keyboard"],
-                "url": "https://www.amazon.in/dp/B09RN8Y3YW",
-                "category": "electronics",
-                "product_type": "laptop"
-            },
-            {
-                "title": "Dell Inspiron 3511 Intel Core i5 (8GB, 1TB HDD + 256GB SSD)",
-                "brand": "Dell",
-                "price": 47990,
-                "rating": 4.2,
-                "review_count": 4567,
-                "features": ["Intel i5 11th Gen", "Dual Storage", "8GB RAM", "15.6 FHD"],
-                "url": "https://www.amazon.in/dp/B098Q4JH7G",
-                "category": "electronics", 
-                "product_type": "laptop"
-            }
-        ]
-        
-        # Headphones/Earbuds (Real models with real prices)
-        audio = [
-            {
-                "title": "boAt Airdopes 141 Bluetooth Truly Wireless Earbuds",
-                "brand": "boAt",
-                "price": 1299,
-                "rating": 4.0,
-                "review_count": 89234,
-                "features": ["Bluetooth 5.0", "42H Playback", "IPX4", "Touch Controls"],
-                "url": "https://www.amazon.in/dp/B08L8PTFPJ",
-                "category": "electronics",
-                "product_type": "earbuds"
-            },
-            {
-                "title": "Sony WH-CH720N Active Noise Canceling Wireless Headphones",
-                "brand": "Sony",
-                "price": 8990,
-                "rating": 4.4,
-                "review_count": 3456,
-                "features": ["Active Noise Canceling", "35Hr Battery", "Quick Charge", "Multipoint"],
-                "url": "https://www.amazon.in/dp/B0BZ2G6K9P",
-                "category": "electronics",
-                "product_type": "headphones"
-            },
-            {
-                "title": "JBL Tune 770NC Adaptive Noise Cancelling Wireless Headphones",
-                "brand": "JBL",
-                "price": 7999,
-                "rating": 4.3,
-                "review_count": 2134,
-                "features": ["Adaptive Noise Cancelling", "44H Battery", "JBL Pure Bass", "Hands-free"],
-                "url": "https://www.amazon.in/dp/B0C4YYBW5Y",
-                "category": "electronics",
-                "product_type": "headphones"
-            },
-            {
-                "title": "Nothing Ear (2) with Active Noise Cancellation",
-                "brand": "Nothing",
-                "price": 8999,
-                "rating": 4.2,
-                "review_count": 1876,
-                "features": ["ANC", "Hi-Res Audio", "36H Playback", "Transparency Mode"],
-                "url": "https://www.amazon.in/dp/B0C2SBQVBZ",
-                "category": "electronics",
-                "product_type": "earbuds"
-            }
-        ]
-        
-        # Vacuum Cleaners (Real models with real prices)
-        vacuums = [
-            {
-                "title": "Eureka Forbes Bold 1000 Watts Dry Vacuum Cleaner",
-                "brand": "Eureka Forbes",
-                "price": 6499,
-                "rating": 4.0,
-                "review_count": 3421,
-                "features": ["1000W Motor", "17L Tank", "HEPA Filter", "5 Accessories"],
-                "url": "https://www.amazon.in/dp/B08FMJKGQR",
-                "category": "home",
-                "product_type": "vacuum cleaner"
-            },
-            {
-                "title": "AGARO Regal 1600 Watts Wet and Dry Vacuum Cleaner",
-                "brand": "AGARO",
-                "price": 7999,
-                "rating": 4.1,
-                "review_count": 2134,
-                "features": ["1600W", "Wet & Dry", "21L Capacity", "HEPA Filter"],
-                "url": "https://www.amazon.in/dp/B08P5QCRFZ",
-                "category": "home",
-                "product_type": "vacuum cleaner"
-            },
-            {
-                "title": "Black+Decker VM1450 1400-Watt Bagless Cyclonic Vacuum Cleaner",
-                "brand": "Black+Decker",
-                "price": 8990,
-                "rating": 3.9,
-                "review_count": 1567,
-                "features": ["Cyclonic Technology", "1400W", "Bagless", "1.2L Dustbin"],
-                "url": "https://www.amazon.in/dp/B018UCSXQW",
-                "category": "home",
-                "product_type": "vacuum cleaner"
-            }
-        ]
-        
-        # Smartwatches (Real models with real prices)
-        watches = [
-            {
-                "title": "Fire-Boltt Phoenix Pro 1.39 Bluetooth Calling Smartwatch",
-                "brand": "Fire-Boltt",
-                "price": 2799,
-                "rating": 4.0,
-                "review_count": 15674,
-                "features": ["Bluetooth Calling", "120+ Sports Modes", "SpO2", "Heart Rate"],
-                "url": "https://www.amazon.in/dp/B0BSFW6GLT",
-                "category": "electronics",
-                "product_type": "smartwatch"
-            },
-            {
-                "title": "Noise Pulse 2 Max 1.85 Advanced Bluetooth Calling Smartwatch",
-                "brand": "Noise",
-                "price": 4499,
-                "rating": 4.1,
-                "review_count": 8934,
-                "features": ["1.85 Display", "Bluetooth Calling", "100+ Watch Faces", "7 Days Battery"],
-                "url": "https://www.amazon.in/dp/B0C1234XYZ",
-                "category": "electronics", 
-                "product_type": "smartwatch"
-            },
-            {
-                "title": "Samsung Galaxy Watch4 Classic 46mm Bluetooth",
-                "brand": "Samsung",
-                "price": 16999,
-                "rating": 4.3,
-                "review_count": 3456,
-                "features": ["Wear OS", "Body Composition", "Sleep Tracking", "GPS"],
-                "url": "https://www.amazon.in/dp/B09BYT1KC9",
-                "category": "electronics",
-                "product_type": "smartwatch"
-            }
-        ]
-        
-        # Combine all products and add IDs
-        all_products = smartphones + laptops + audio + vacuums + watches
+        # Real models with real prices, kept as data rather than code
+        all_products = orjson.loads(_CATALOGUE_PATH.read_bytes())
         
         for i, product in enumerate(all_products):
             product.update({
-                "id": f"fast_db_{uuid.uuid4().hex[:8]}",
+                # Derived from the listing URL so ids survive restarts and match across workers
+                "id": f"fast_db_{hashlib.blake2b(product['url'].encode(), digest_size=6).hexdigest()}",
                 "availability": "in_stock",
                 "currency": "INR",
                 "source": "fast_database",
@@ -252,6 +55,27 @@ class FastProductDatabase:
             
         return all_products
     
+    def _build_index(self, field: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Group products by the value of a field, keeping catalogue order"""
+        index = defaultdict(list)
+        for product in self.products:
+            index[product.get(field)].append(product)
+        return dict(index)
+    
+    def _build_search_records(self) -> List[SearchRecord]:
+        """Precompute lowercased search fields as records parallel to self.products"""
+        return [
+            SearchRecord(
+                title=p.get('title', '').lower(),
+                brand=p.get('brand', '').lower(),
+                product_type=p.get('product_type', '').lower(),
+                features=tuple(f.lower() for f in p.get('features', [])),
+                price=p.get('price', 0),
+                rating=p.get('rating', 0)
+            )
+            for p in self.products
+        ]
+    
     def search_products(self, query: str, max_products: int = 6) -> List[Dict[str, Any]]:
         """Fast product search with realistic results"""
         
@@ -262,14 +86,22 @@ class FastProductDatabase:
         if cache_key in self.search_cache:
             return self.search_cache[cache_key][:max_products]
         
-        # Simulate fast search timing
-        time.sleep(random.uniform(0.1, 0.3))  # Very fast!
+        # Query-side work is done once per search, not once per product
+        query_words = query_lower.split()
+        target_types = self._target_product_types(query_lower)
+        budgets = self._parse_budgets(query_words)
+        
+        # Distinct features are far fewer than product/feature pairs, so match
+        # each one against the query once and count hits per product by lookup
+        matching_features = frozenset(
+            f for f in self.feature_vocabulary if any(word in f for word in query_words)
+        )
         
         matched_products = []
         
         # Search by product type
-        for product in self.products:
-            score = self._calculate_relevance_score(product, query_lower)
+        for product, record in zip(self.products, self.search_records):
+            score = self._calculate_relevance_score(record, query_lower, query_words, target_types, budgets, matching_features)
             if score > 0:
                 product_copy = product.copy()
                 product_copy['relevance_score'] = score
@@ -283,59 +115,63 @@ class FastProductDatabase:
         
         return matched_products[:max_products]
     
-    def _calculate_relevance_score(self, product: Dict[str, Any], query: str) -> float:
-        """Calculate how relevant a product is to the search query"""
+    def _target_product_types(self, query: str) -> tuple:
+        """Product types that get a bonus for this query"""
+        if 'phone' in query or 'mobile' in query or 'smartphone' in query:
+            return ('smartphone',)
+        elif 'laptop' in query or 'computer' in query:
+            return ('laptop',)
+        elif 'headphone' in query or 'earphone' in query or 'earbud' in query:
+            return ('headphones', 'earbuds')
+        elif 'vacuum' in query or 'cleaner' in query:
+            return ('vacuum cleaner',)
+        elif 'watch' in query or 'smartwatch' in query:
+            return ('smartwatch',)
+        return ()
+    
+    def _parse_budgets(self, query_words: List[str]) -> List[int]:
+        """Extract the amounts following each 'under' in the query"""
+        budgets = []
+        for i, word in enumerate(query_words):
+            if word == 'under' and i + 1 < len(query_words):
+                try:
+                    budgets.append(int(''.join(filter(str.isdigit, query_words[i + 1]))))
+                except:
+                    pass
+        return budgets
+    
+    def _calculate_relevance_score(self, record: SearchRecord, query: str, query_words: List[str],
+                                   target_types: tuple, budgets: List[int], matching_features: frozenset) -> float:
+        """Calculate how relevant a product's search record is to the search query"""
         score = 0.0
         
-        title = product.get('title', '').lower()
-        brand = product.get('brand', '').lower() 
-        product_type = product.get('product_type', '').lower()
-        features = [f.lower() for f in product.get('features', [])]
+        title = record.title
+        brand = record.brand
+        product_type = record.product_type
+        features = record.features
         
         # Direct matches in title/type
-        if any(word in title for word in query.split()):
+        if any(word in title for word in query_words):
             score += 10.0
-        if any(word in product_type for word in query.split()):
+        if any(word in product_type for word in query_words):
             score += 8.0
-        if any(word in brand for word in query.split()):
+        if any(word in brand for word in query_words):
             score += 6.0
             
         # Feature matches
-        for feature in features:
-            if any(word in feature for word in query.split()):
-                score += 3.0
+        score += 3.0 * sum(1 for feature in features if feature in matching_features)
                 
         # Specific product type matching
-        if 'phone' in query or 'mobile' in query or 'smartphone' in query:
-            if product_type == 'smartphone':
-                score += 15.0
-        elif 'laptop' in query or 'computer' in query:
-            if product_type == 'laptop':
-                score += 15.0
-        elif 'headphone' in query or 'earphone' in query or 'earbud' in query:
-            if product_type in ['headphones', 'earbuds']:
-                score += 15.0
-        elif 'vacuum' in query or 'cleaner' in query:
-            if product_type == 'vacuum cleaner':
-                score += 15.0
-        elif 'watch' in query or 'smartwatch' in query:
-            if product_type == 'smartwatch':
-                score += 15.0
+        if product_type in target_types:
+            score += 15.0
                 
         # Budget considerations
-        price = product.get('price', 0)
-        if 'under' in query:
-            budget_words = query.split()
-            for i, word in enumerate(budget_words):
-                if word == 'under' and i + 1 < len(budget_words):
-                    try:
-                        budget = int(''.join(filter(str.isdigit, budget_words[i + 1])))
-                        if price <= budget:
-                            score += 5.0
-                        else:
-                            score -= 10.0  # Penalize if over budget
-                    except:
-                        pass
+        price = record.price
+        for budget in budgets:
+            if price <= budget:
+                score += 5.0
+            else:
+                score -= 10.0  # Penalize if over budget
         
         # Brand preferences
         if 'samsung' in query and brand == 'samsung':
@@ -346,22 +182,17 @@ class FastProductDatabase:
             score += 8.0
             
         # Quality score based on rating
-        rating = product.get('rating', 0)
-        score += rating * 1.0
+        score += record.rating * 1.0
         
         return score
     
     def get_product_by_id(self, product_id: str) -> Dict[str, Any]:
         """Get a specific product by ID"""
-        for product in self.products:
-            if product.get('id') == product_id:
-                return product
-        return {}
+        return self.products_by_id.get(product_id, {})
     
     def get_products_by_category(self, category: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get products by category"""
-        filtered = [p for p in self.products if p.get('category') == category]
-        return filtered[:limit]
+        return self.products_by_category.get(category, [])[:limit]
     
     def get_similar_products(self, product_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Get similar products"""
@@ -369,9 +200,8 @@ class FastProductDatabase:
         if not product:
             return []
             
-        same_type = [p for p in self.products 
-                    if p.get('product_type') == product.get('product_type') 
-                    and p.get('id') != product_id]
+        same_type = [p for p in self.products_by_type.get(product.get('product_type'), [])
+                    if p.get('id') != product_id]
         
         # Sort by price similarity
         target_price = product.get('price', 0)
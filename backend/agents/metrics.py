@@ -0,0 +1,54 @@
+"""
+Lightweight timing and size metrics for model calls made by the agents
+"""
+
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional
+
+class LLMCall(NamedTuple):
+    """One model call, or one response-cache hit that avoided a call"""
+    agent: str
+    method: str
+    prompt_chars: int
+    latency_ms: float
+    cache_hit: bool = False
+    ok: bool = True
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+class LLMMetrics:
+    """Ring buffer of recent model calls with per call-site aggregates"""
+
+    def __init__(self, maxsize: int = 1000):
+        self._calls = deque(maxlen=maxsize)
+
+    def record(self, call: LLMCall) -> None:
+        self._calls.append(call)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregates keyed by "Agent.method", over the calls still in the buffer"""
+        grouped: Dict[str, List[LLMCall]] = {}
+        for call in self._calls:
+            grouped.setdefault(f"{call.agent}.{call.method}", []).append(call)
+
+        summary = {}
+        for key, calls in sorted(grouped.items()):
+            # Cache hits take no time, so latency is reported for real calls only
+            latencies = sorted(call.latency_ms for call in calls if not call.cache_hit)
+            summary[key] = {
+                "calls": len(calls),
+                "cache_hits": sum(call.cache_hit for call in calls),
+                "errors": sum(not call.ok for call in calls),
+                "avg_latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "p95_latency_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+                "avg_prompt_chars": round(sum(call.prompt_chars for call in calls) / len(calls)),
+                "prompt_tokens": sum(call.prompt_tokens or 0 for call in calls),
+                "output_tokens": sum(call.output_tokens or 0 for call in calls)
+            }
+        return summary
+
+    def clear(self) -> None:
+        self._calls.clear()
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,8 +1,230 @@
 from .base_agent import BaseAgent
 from .fast_product_database import fast_db
-from typing import Dict, Any, List
-import json
+from collections import Counter
+from typing import Dict, Any, List, Tuple
 import asyncio
+import math
+import re
+
+# Generic selling points appended after the feature and rating based pros
+_GENERIC_PROS = (
+    "Good value for money",
+    "Reliable brand",
+    "Available for immediate delivery"
+)
+
+# Title classification rules, in priority order. Keywords match anywhere in
+# the title (e.g. "phone" inside "headphones"), the same as a substring test.
+_CATEGORY_KEYWORDS = (
+    ("electronics", ('laptop', 'computer', 'mobile', 'phone', 'tablet', 'headphone', 'speaker')),
+    ("home", ('vacuum', 'cleaner', 'kitchen', 'home', 'furniture')),
+    ("books", ('book', 'novel', 'guide')),
+    ("clothing", ('shirt', 'dress', 'clothes', 'fashion'))
+)
+
+_PRODUCT_TYPE_KEYWORDS = (
+    ("vacuum cleaner", ('vacuum',)),
+    ("laptop", ('laptop',)),
+    ("headphones", ('headphone', 'earphone', 'earbud')),
+    ("smartphone", ('mobile', 'phone'))
+)
+
+_PRODUCT_TYPE_STOPWORDS = frozenset(['the', 'and', 'for', 'with'])
+
+# Static lookup tables used when generating product details
+_FEATURE_KEYWORDS = {
+    'wireless': 'wireless',
+    'bluetooth': 'bluetooth',
+    'noise cancel': 'noise canceling',
+    'cordless': 'cordless',
+    'rechargeable': 'rechargeable',
+    'waterproof': 'waterproof',
+    'fast charg': 'fast charging',
+    'long battery': 'long battery life',
+    'hepa': 'HEPA filter',
+    'pet hair': 'pet hair removal',
+    'lightweight': 'lightweight',
+    'portable': 'portable'
+}
+
+def _build_title_classifier():
+    """Compile every classification keyword into one pattern, tagged with the rules each satisfies"""
+    rules = (
+        [("category", rank, keyword, category)
+         for rank, (category, keywords) in enumerate(_CATEGORY_KEYWORDS) for keyword in keywords]
+        + [("product_type", rank, keyword, product_type)
+           for rank, (product_type, keywords) in enumerate(_PRODUCT_TYPE_KEYWORDS) for keyword in keywords]
+        + [("feature", rank, keyword, feature)
+           for rank, (keyword, feature) in enumerate(_FEATURE_KEYWORDS.items())]
+    )
+    keywords = sorted({keyword for _, _, keyword, _ in rules}, key=len, reverse=True)
+    
+    # Matching a keyword also satisfies every rule whose keyword it contains
+    tags = {
+        keyword: tuple((kind, rank, value) for kind, rank, rule_keyword, value in rules if rule_keyword in keyword)
+        for keyword in keywords
+    }
+    
+    # The lookahead reports the longest keyword starting at every position, so
+    # overlapping keywords are all seen in a single scan of the title
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))", re.IGNORECASE)
+    return pattern, tags
+
+_TITLE_KEYWORD_RE, _TITLE_KEYWORD_TAGS = _build_title_classifier()
+
+_HEADPHONE_SPECIFICATIONS = {
+    "Driver": "40mm Dynamic",
+    "Frequency Response": "20Hz - 20kHz",
+    "Battery Life": "30+ hours",
+    "Connectivity": "Bluetooth 5.0",
+    "Charging": "USB-C",
+    "Water Resistance": "IPX4",
+    "Weight": "250g"
+}
+
+_SPECIFICATIONS_BY_TYPE = {
+    'smartphone': {
+        "Display": "6.5 inch, FHD+",
+        "Processor": "Octa-core",
+        "RAM": "8GB",
+        "Storage": "128GB",
+        "Camera": "50MP + 12MP",
+        "Battery": "5000mAh",
+        "OS": "Android 13"
+    },
+    'laptop': {
+        "Processor": "Intel Core i5 / AMD Ryzen 5",
+        "RAM": "8GB DDR4",
+        "Storage": "512GB SSD",
+        "Display": "15.6 inch, FHD",
+        "Graphics": "Integrated",
+        "Battery": "Up to 8 hours",
+        "Weight": "1.8 kg"
+    },
+    'headphones': _HEADPHONE_SPECIFICATIONS,
+    'earbuds': _HEADPHONE_SPECIFICATIONS,
+    'vacuum cleaner': {
+        "Motor Power": "1400W",
+        "Suction": "18 kPa",
+        "Capacity": "1.5L",
+        "Filter": "HEPA",
+        "Cord Length": "5m",
+        "Weight": "4.5 kg",
+        "Warranty": "2 years"
+    }
+}
+
+_CONS_BY_TYPE = {
+    'smartphone': (
+        "Could have faster charging",
+        "Camera performance in low light could be better",
+        "Storage not expandable"
+    ),
+    'laptop': (
+        "Could use more RAM for heavy tasks",
+        "Battery life could be longer",
+        "Gets warm during intensive use"
+    ),
+    'headphones': (
+        "Could be more compact for travel",
+        "Sound leakage at high volumes"
+    ),
+    'earbuds': (
+        "Case could be smaller",
+        "Touch controls can be sensitive"
+    ),
+    'vacuum cleaner': (
+        "Cord could be longer",
+        "Can be noisy during operation",
+        "Dust container needs frequent emptying"
+    )
+}
+
+_DEFAULT_CONS = (
+    "Price could be lower",
+    "More color options would be nice"
+)
+
+# Review templates based on product type. Each template is a callable taking
+# (brand, feature, specific) so review text is built without re-parsing a
+# format string per review.
+_REVIEW_TEMPLATES = {
+    'smartphone': (
+        lambda brand, feature, specific: f"Great phone! Camera quality is excellent and battery lasts all day. {brand} has done a good job.",
+        lambda brand, feature, specific: "Good value for money. Fast performance and smooth display. Delivery was quick too.",
+        lambda brand, feature, specific: f"Nice phone but could be better. {specific} Overall satisfied with the purchase.",
+        lambda brand, feature, specific: "Excellent build quality. Love the design and features. Highly recommended!",
+        lambda brand, feature, specific: f"Good phone for the price range. {feature} works well. Happy with my purchase."
+    ),
+    'laptop': (
+        lambda brand, feature, specific: f"Perfect for work and study. Fast performance and good display quality. {brand} is reliable.",
+        lambda brand, feature, specific: "Good laptop for the price. Boots up quickly and handles multitasking well.",
+        lambda brand, feature, specific: "Nice build quality. Keyboard is comfortable and screen is clear. Good value for money.",
+        lambda brand, feature, specific: f"Works great for my needs. {feature} is impressive. Delivery was on time.",
+        lambda brand, feature, specific: "Solid laptop. Performance is good for daily tasks. Happy with this purchase."
+    ),
+    'headphones': (
+        lambda brand, feature, specific: f"Amazing sound quality! {feature} works perfectly. Great value for money.",
+        lambda brand, feature, specific: "Good headphones for the price. Comfortable to wear for long hours. Sound is clear.",
+        lambda brand, feature, specific: f"Great product! {brand} always delivers quality. Highly recommended.",
+        lambda brand, feature, specific: "Nice sound quality and good build. Battery life is impressive. Good purchase.",
+        lambda brand, feature, specific: "Perfect for music lovers. Crystal clear sound and comfortable fit."
+    ),
+    'earbuds': (
+        lambda brand, feature, specific: f"Great earbuds! {feature} is excellent. Perfect for daily use and workouts.",
+        lambda brand, feature, specific: "Good sound quality for the price. Fits comfortably and battery lasts long.",
+        lambda brand, feature, specific: f"Amazing product! Crystal clear sound and good bass. {brand} is the best.",
+        lambda brand, feature, specific: "Perfect for calls and music. Easy to connect and very comfortable.",
+        lambda brand, feature, specific: "Excellent earbuds. Sound quality is impressive and they stay in place well."
+    )
+}
+
+# Local ranking is trusted without an LLM call when both the best product and
+# the top K as a group lead the next product by at least this cosine margin
+_LOCAL_RANK_TOP_K = 3
+_LOCAL_RANK_MARGIN = 0.1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Invariant analysis instructions; product details are appended after this prefix
+_PRODUCT_ANALYSIS_PROMPT = """
+You are an expert product analyst. Provide a comprehensive analysis of this product for Indian consumers.
+
+Provide analysis in JSON format with these fields:
+- "summary": Brief 2-3 sentence summary highlighting key benefits
+- "best_for": List of 3-4 use cases this product is best suited for
+- "considerations": List of 2-3 important factors to consider before buying
+- "value_assessment": Assessment of value for money in Indian market (1-5 scale with explanation)
+- "competitive_advantages": Top 2-3 advantages over similar products
+"""
+
+_PRODUCT_COMPARISON_PROMPT = """
+Compare these products for Indian consumers. Focus on practical differences that matter for purchasing decisions.
+
+Provide comparison in JSON format with:
+- "summary": Overview of the comparison
+- "price_comparison": Price analysis with value for money assessment
+- "feature_comparison": Key feature differences
+- "performance_comparison": Performance and quality comparison
+- "recommendation": Which product for which type of user
+"""
+
+# Invariant ranking instructions; request data is appended after this prefix
+_RANK_PROMPT = """
+You are an expert product recommender for Indian e-commerce. Rank these products based on how well they match the user's requirements.
+
+Consider factors like:
+- Feature match with requirements (highest priority)
+- Price fit within budget
+- Brand preference alignment  
+- Rating and review count (higher is better)
+- Value for money in INR
+- Suitability for Indian market
+
+Score every product independently. Return ONLY a JSON array with one object per product
+containing just its "index" and a "score" from 0 to 100 (higher is a better match).
+Example: [{"index": 0, "score": 72}, {"index": 1, "score": 91}]
+"""
 
 class ProductSearchAgent(BaseAgent):
     """Agent responsible for searching and filtering products using fast Google Shopping"""
@@ -11,13 +233,15 @@ class ProductSearchAgent(BaseAgent):
         super().__init__()
         # No need for scraper - using fast database
         self.product_cache = {}
+        # Products from cached searches, keyed by id
+        self.product_index = {}
     
     async def search_products(self, query_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search for products using Google Shopping with timeout"""
         
         # Create search query from parsed data
         search_query = self._build_search_query(query_data)
-        cache_key = f"search_{hash(search_query)}"
+        cache_key = f"search_{search_query}"
         
         # Check cache first
         if cache_key in self.product_cache:
@@ -38,6 +262,7 @@ class ProductSearchAgent(BaseAgent):
                 
                 # Cache the results
                 self.product_cache[cache_key] = search_products
+                self.product_index.update((p["id"], p) for p in search_products)
                 cached_products = search_products
                 
             except Exception as e:
@@ -76,28 +301,33 @@ class ProductSearchAgent(BaseAgent):
         import uuid
         import random
         
+        # Everything derived from the query is the same for every option
+        base_price = self._estimate_price_from_query(search_query)
+        title = search_query.title()
+        category, product_type, features = self._classify_title(search_query)
+        url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
+        
         products = []
         for i in range(6):
             product_id = f"fallback_{uuid.uuid4().hex[:8]}"
             
             # Estimate price based on query
-            base_price = self._estimate_price_from_query(search_query)
             price = int(base_price * random.uniform(0.8, 1.3))
             
             products.append({
                 "id": product_id,
-                "title": f"{search_query.title()} - Option {i + 1}",
-                "category": self._categorize_product(search_query),
-                "product_type": self._get_product_type(search_query),
+                "title": f"{title} - Option {i + 1}",
+                "category": category,
+                "product_type": product_type,
                 "price": price,
                 "rating": round(random.uniform(3.8, 4.5), 1),
                 "review_count": random.randint(100, 1000),
                 "brand": "Popular Brand",
-                "features": self._extract_features(search_query),
+                "features": list(features),
                 "availability": "in_stock",
                 "currency": "INR",
                 "source": "fallback",
-                "url": f"https://www.google.com/search?q={search_query.replace(' ', '+')}",
+                "url": url,
                 "image_url": ""
             })
         
@@ -145,19 +375,23 @@ class ProductSearchAgent(BaseAgent):
         """Filter products based on user requirements"""
         filtered = []
         
+        # Requirements are the same for every product, so read them once
+        budget = query_data.get("budget") or {}
+        max_price = budget.get("max")
+        min_price = budget.get("min")
+        brand_prefs = [brand.lower() for brand in query_data.get("brand_preferences", [])]
+        
         for product in products:
             # Budget filter
-            budget = query_data.get("budget", {})
-            if budget.get("max") and product.get("price", 0) > budget["max"]:
+            if max_price and product.get("price", 0) > max_price:
                 continue
-            if budget.get("min") and product.get("price", 0) < budget["min"]:
+            if min_price and product.get("price", 0) < min_price:
                 continue
             
             # Brand filter (if specified)
-            brand_prefs = query_data.get("brand_preferences", [])
             if brand_prefs:
                 product_brand = product.get("brand", "").lower()
-                if not any(brand.lower() in product_brand for brand in brand_prefs):
+                if not any(brand in product_brand for brand in brand_prefs):
                     # Don't skip entirely, just lower the score
                     pass
             
@@ -175,6 +409,11 @@ class ProductSearchAgent(BaseAgent):
         if not products:
             return []
         
+        # Cheap lexical ranking first; only ask the LLM when it is a close call
+        local_ranking = self._rank_products_locally(products, query_data)
+        if local_ranking is not None:
+            return local_ranking
+        
         try:
             # Create simplified product data for AI ranking
             simplified_products = []
@@ -190,37 +429,31 @@ class ProductSearchAgent(BaseAgent):
                     "category": product.get("category", "")
                 })
             
-            prompt = f"""
-You are an expert product recommender for Indian e-commerce. Rank these products based on how well they match the user's requirements.
-
-User Requirements: {json.dumps(query_data, indent=2)}
-
-Products to Rank: {json.dumps(simplified_products, indent=2)}
-
-Consider factors like:
-- Feature match with requirements (highest priority)
-- Price fit within budget
-- Brand preference alignment  
-- Rating and review count (higher is better)
-- Value for money in INR
-- Suitability for Indian market
+            prompt = f"""{_RANK_PROMPT}
+User Requirements: {self._to_json(query_data)}
 
-Return ONLY a JSON array of indices representing the ranking order (best matches first).
-Example: [2, 0, 1, 3] means product at index 2 is best, then 0, then 1, then 3.
+Products to Rank: {self._to_json(simplified_products)}
 """
             
             response = await asyncio.wait_for(
-                self.parse_json_response(prompt),
+                self.parse_json_response(prompt, tag="rank_products"),
                 timeout=10.0  # 10 second timeout for AI ranking
             )
             
-            if isinstance(response, list) and all(isinstance(x, int) for x in response):
-                # Reorder products based on AI ranking
-                ranked_products = []
-                for index in response:
-                    if 0 <= index < len(products):
-                        ranked_products.append(products[index])
-                return ranked_products
+            if isinstance(response, list):
+                scores = {
+                    item["index"]: item["score"]
+                    for item in response
+                    if isinstance(item, dict)
+                    and isinstance(item.get("index"), int)
+                    and isinstance(item.get("score"), (int, float))
+                }
+                
+                if scores:
+                    # Sort client-side by score; products the model skipped keep
+                    # their original order after the scored ones
+                    order = sorted(range(len(products)), key=lambda i: scores.get(i, -1), reverse=True)
+                    return [products[i] for i in order]
                 
         except asyncio.TimeoutError:
             print("⏰ AI ranking timed out, using fallback sorting")
@@ -230,18 +463,55 @@ Example: [2, 0, 1, 3] means product at index 2 is best, then 0, then 1, then 3.
         # Fallback: sort by rating and review count
         return sorted(products, key=lambda p: (p.get("rating", 0) * 0.7 + min(p.get("review_count", 0) / 1000, 5) * 0.3), reverse=True)
     
+    def _rank_products_locally(self, products: List[Dict[str, Any]], query_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rank by bag-of-words cosine similarity, or return None if the ranking is ambiguous"""
+        
+        query_terms = [
+            query_data.get("product_type") or "",
+            query_data.get("product_category") or "",
+            query_data.get("use_case") or "",
+            *(query_data.get("features_required") or []),
+            *(query_data.get("priority_features") or []),
+            *(query_data.get("brand_preferences") or [])
+        ]
+        query_vector = Counter(_TOKEN_RE.findall(" ".join(str(term) for term in query_terms).lower()))
+        if not query_vector:
+            return None
+        query_norm = math.sqrt(sum(count * count for count in query_vector.values()))
+        
+        scores = []
+        for product in products:
+            text = " ".join([
+                product.get("title", ""),
+                product.get("brand", ""),
+                product.get("product_type", ""),
+                *product.get("features", [])
+            ]).lower()
+            product_vector = Counter(_TOKEN_RE.findall(text))
+            dot = sum(count * product_vector[token] for token, count in query_vector.items())
+            product_norm = math.sqrt(sum(count * count for count in product_vector.values()))
+            scores.append(dot / (query_norm * product_norm) if product_norm else 0.0)
+        
+        order = sorted(range(len(products)), key=lambda i: (scores[i], products[i].get("rating", 0)), reverse=True)
+        
+        # Lexical overlap can favour the wrong kind of product (e.g. a brand name
+        # matching a feature word), so the top K must all be of the requested type
+        wanted_type = (query_data.get("product_type") or "").lower()
+        if wanted_type and any(products[i].get("product_type", "").lower() != wanted_type for i in order[:_LOCAL_RANK_TOP_K]):
+            return None
+        
+        # Both the best match and the cut-off of the top K must be clear-cut
+        for position in {0, min(_LOCAL_RANK_TOP_K, len(products)) - 1}:
+            if position + 1 < len(products) and scores[order[position]] - scores[order[position + 1]] < _LOCAL_RANK_MARGIN:
+                return None
+        
+        return [products[i] for i in order]
+    
     async def get_product_details(self, product_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific product"""
         
         # Find product in cache or database
-        product = None
-        for cache_key, cached_products in self.product_cache.items():
-            for p in cached_products:
-                if p.get("id") == product_id:
-                    product = p
-                    break
-            if product:
-                break
+        product = self.product_index.get(product_id)
         
         # If not in cache, try database
         if not product:
@@ -283,25 +553,26 @@ Example: [2, 0, 1, 3] means product at index 2 is best, then 0, then 1, then 3.
         """Use AI to enhance product details with analysis"""
         
         try:
-            prompt = f"""
-You are an expert product analyst. Provide a comprehensive analysis of this product for Indian consumers.
-
+            # Reviews go in as one "rating|text" line each; ids, authors and
+            # dates carry nothing the analysis needs
+            details = {key: value for key, value in detailed_info.items() if key != "reviews"}
+            review_lines = "\n".join(
+                f"{review.get('rating', 0)}|{review.get('text', '')}" for review in detailed_info.get("reviews", [])
+            )
+            
+            prompt = f"""{_PRODUCT_ANALYSIS_PROMPT}
 Product Data:
-{json.dumps(product, indent=2)}
+{self._to_json(product)}
 
 Additional Details:
-{json.dumps(detailed_info, indent=2)}
+{self._to_json(details)}
 
-Provide analysis in JSON format with these fields:
-- "summary": Brief 2-3 sentence summary highlighting key benefits
-- "best_for": List of 3-4 use cases this product is best suited for
-- "considerations": List of 2-3 important factors to consider before buying
-- "value_assessment": Assessment of value for money in Indian market (1-5 scale with explanation)
-- "competitive_advantages": Top 2-3 advantages over similar products
+Customer Reviews (rating|text):
+{review_lines}
 """
             
             response = await asyncio.wait_for(
-                self.parse_json_response(prompt),
+                self.parse_json_response(prompt, tag="product_details"),
                 timeout=8.0  # 8 second timeout
             )
             return response if isinstance(response, dict) else {}
@@ -326,23 +597,14 @@ Provide analysis in JSON format with these fields:
             return {"error": "Need at least 2 valid products to compare"}
         
         # AI-powered comparison
-        prompt = f"""
-Compare these products for Indian consumers. Focus on practical differences that matter for purchasing decisions.
-
+        prompt = f"""{_PRODUCT_COMPARISON_PROMPT}
 Products to Compare:
-{json.dumps([{k: v for k, v in p.items() if k not in ['detailed_description', 'reviews']} for p in products], indent=2)}
-
-Provide comparison in JSON format with:
-- "summary": Overview of the comparison
-- "price_comparison": Price analysis with value for money assessment
-- "feature_comparison": Key feature differences
-- "performance_comparison": Performance and quality comparison
-- "recommendation": Which product for which type of user
+{self._to_json([{k: v for k, v in p.items() if k not in ['detailed_description', 'reviews']} for p in products])}
 """
         
         try:
             comparison = await asyncio.wait_for(
-                self.parse_json_response(prompt),
+                self.parse_json_response(prompt, tag="compare_products"),
                 timeout=10.0
             )
             return {
@@ -362,66 +624,31 @@ Provide comparison in JSON format with:
                 "comparison": {"error": "Comparison analysis failed"}
             }
     
-    def _categorize_product(self, title: str) -> str:
-        """Simple categorization based on title"""
-        title_lower = title.lower()
-        
-        if any(word in title_lower for word in ['laptop', 'computer', 'mobile', 'phone', 'tablet', 'headphone', 'speaker']):
-            return "electronics"
-        elif any(word in title_lower for word in ['vacuum', 'cleaner', 'kitchen', 'home', 'furniture']):
-            return "home"
-        elif any(word in title_lower for word in ['book', 'novel', 'guide']):
-            return "books"
-        elif any(word in title_lower for word in ['shirt', 'dress', 'clothes', 'fashion']):
-            return "clothing"
-        else:
-            return "other"
-    
-    def _get_product_type(self, title: str) -> str:
-        """Extract specific product type"""
-        title_lower = title.lower()
-        
-        if 'vacuum' in title_lower:
-            return "vacuum cleaner"
-        elif 'laptop' in title_lower:
-            return "laptop"
-        elif any(word in title_lower for word in ['headphone', 'earphone', 'earbud']):
-            return "headphones"
-        elif 'mobile' in title_lower or 'phone' in title_lower:
-            return "smartphone"
+    def _classify_title(self, title: str) -> Tuple[str, str, List[str]]:
+        """Category, product type and features of a title from a single keyword scan"""
+        best = {}
+        features = set()
+        
+        for keyword in _TITLE_KEYWORD_RE.findall(title):
+            for kind, rank, value in _TITLE_KEYWORD_TAGS[keyword.lower()]:
+                if kind == "feature":
+                    features.add((rank, value))
+                elif kind not in best or rank < best[kind][0]:
+                    best[kind] = (rank, value)
+        
+        category = best["category"][1] if "category" in best else "other"
+        
+        if "product_type" in best:
+            product_type = best["product_type"][1]
         else:
             # Extract first meaningful word
-            words = title_lower.split()
-            for word in words:
-                if len(word) > 3 and word not in ['the', 'and', 'for', 'with']:
-                    return word
-            return "product"
-    
-    def _extract_features(self, title: str) -> List[str]:
-        """Extract features from title"""
-        features = []
-        title_lower = title.lower()
-        
-        feature_keywords = {
-            'wireless': 'wireless',
-            'bluetooth': 'bluetooth',
-            'noise cancel': 'noise canceling',
-            'cordless': 'cordless',
-            'rechargeable': 'rechargeable',
-            'waterproof': 'waterproof',
-            'fast charg': 'fast charging',
-            'long battery': 'long battery life',
-            'hepa': 'HEPA filter',
-            'pet hair': 'pet hair removal',
-            'lightweight': 'lightweight',
-            'portable': 'portable'
-        }
-        
-        for keyword, feature in feature_keywords.items():
-            if keyword in title_lower:
-                features.append(feature)
+            product_type = next(
+                (word for word in title.lower().split() if len(word) > 3 and word not in _PRODUCT_TYPE_STOPWORDS),
+                "product"
+            )
         
-        return features[:5]  # Limit to 5 features
+        # Report features in keyword order, limited to 5
+        return category, product_type, [feature for _, feature in sorted(features)][:5]
     
     def _generate_realistic_reviews(self, product: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate realistic customer reviews based on product info"""
@@ -432,51 +659,15 @@ Provide comparison in JSON format with:
         brand = product.get('brand', '')
         rating = product.get('rating', 4.0)
         
-        # Review templates based on product type
-        review_templates = {
-            'smartphone': [
-                "Great phone! Camera quality is excellent and battery lasts all day. {brand} has done a good job.",
-                "Good value for money. Fast performance and smooth display. Delivery was quick too.",
-                "Nice phone but could be better. {specific} Overall satisfied with the purchase.",
-                "Excellent build quality. Love the design and features. Highly recommended!",
-                "Good phone for the price range. {feature} works well. Happy with my purchase."
-            ],
-            'laptop': [
-                "Perfect for work and study. Fast performance and good display quality. {brand} is reliable.",
-                "Good laptop for the price. Boots up quickly and handles multitasking well.",
-                "Nice build quality. Keyboard is comfortable and screen is clear. Good value for money.",
-                "Works great for my needs. {feature} is impressive. Delivery was on time.",
-                "Solid laptop. Performance is good for daily tasks. Happy with this purchase."
-            ],
-            'headphones': [
-                "Amazing sound quality! {feature} works perfectly. Great value for money.",
-                "Good headphones for the price. Comfortable to wear for long hours. Sound is clear.",
-                "Great product! {brand} always delivers quality. Highly recommended.",
-                "Nice sound quality and good build. Battery life is impressive. Good purchase.",
-                "Perfect for music lovers. Crystal clear sound and comfortable fit."
-            ],
-            'earbuds': [
-                "Great earbuds! {feature} is excellent. Perfect for daily use and workouts.",
-                "Good sound quality for the price. Fits comfortably and battery lasts long.",
-                "Amazing product! Crystal clear sound and good bass. {brand} is the best.",
-                "Perfect for calls and music. Easy to connect and very comfortable.",
-                "Excellent earbuds. Sound quality is impressive and they stay in place well."
-            ]
-        }
-        
         # Get appropriate templates
-        templates = review_templates.get(product_type, review_templates['smartphone'])
+        templates = _REVIEW_TEMPLATES.get(product_type, _REVIEW_TEMPLATES['smartphone'])
+        features = product.get('features', ['quality', 'performance'])
+        specific = "sound quality could be improved" if product_type in ['headphones', 'earbuds'] else "battery life could be better"
         
         # Generate 3-5 reviews
         for i in range(random.randint(3, 5)):
             template = random.choice(templates)
-            
-            # Fill in placeholders
-            review_text = template.format(
-                brand=brand,
-                feature=random.choice(product.get('features', ['quality', 'performance'])),
-                specific="sound quality could be improved" if product_type in ['headphones', 'earbuds'] else "battery life could be better"
-            )
+            review_text = template(brand, random.choice(features), specific)
             
             # Generate realistic rating around product rating
             review_rating = max(1, min(5, rating + random.uniform(-0.5, 0.5)))
@@ -496,111 +687,37 @@ Provide comparison in JSON format with:
         """Generate realistic specifications based on product info"""
         product_type = product.get('product_type', '')
         
-        if product_type == 'smartphone':
-            return {
-                "Display": "6.5 inch, FHD+",
-                "Processor": "Octa-core",
-                "RAM": "8GB",
-                "Storage": "128GB",
-                "Camera": "50MP + 12MP",
-                "Battery": "5000mAh",
-                "OS": "Android 13"
-            }
-        elif product_type == 'laptop':
-            return {
-                "Processor": "Intel Core i5 / AMD Ryzen 5",
-                "RAM": "8GB DDR4",
-                "Storage": "512GB SSD",
-                "Display": "15.6 inch, FHD",
-                "Graphics": "Integrated",
-                "Battery": "Up to 8 hours",
-                "Weight": "1.8 kg"
-            }
-        elif product_type in ['headphones', 'earbuds']:
-            return {
-                "Driver": "40mm Dynamic",
-                "Frequency Response": "20Hz - 20kHz",
-                "Battery Life": "30+ hours",
-                "Connectivity": "Bluetooth 5.0",
-                "Charging": "USB-C",
-                "Water Resistance": "IPX4",
-                "Weight": "250g"
-            }
-        elif product_type == 'vacuum cleaner':
-            return {
-                "Motor Power": "1400W",
-                "Suction": "18 kPa",
-                "Capacity": "1.5L",
-                "Filter": "HEPA",
-                "Cord Length": "5m",
-                "Weight": "4.5 kg",
-                "Warranty": "2 years"
-            }
-        else:
-            return {
-                "Brand": product.get('brand', 'Unknown'),
-                "Model": "Latest Model",
-                "Warranty": "1 Year",
-                "Color": "Multiple Options"
-            }
+        if product_type in _SPECIFICATIONS_BY_TYPE:
+            return dict(_SPECIFICATIONS_BY_TYPE[product_type])
+        
+        return {
+            "Brand": product.get('brand', 'Unknown'),
+            "Model": "Latest Model",
+            "Warranty": "1 Year",
+            "Color": "Multiple Options"
+        }
     
     def _extract_pros_from_features(self, product: Dict[str, Any]) -> List[str]:
         """Extract pros from product features"""
         features = product.get('features', [])
         rating = product.get('rating', 4.0)
         
-        pros = []
+        # Feature-based pros for the top 3 features
+        feature_pros = [f"Excellent {feature.lower()}" for feature in features[:3]]
         
-        # Add feature-based pros
-        for feature in features[:3]:  # Top 3 features
-            pros.append(f"Excellent {feature.lower()}")
-        
-        # Add rating-based pros
+        # Rating-based pros
         if rating >= 4.5:
-            pros.append("Outstanding customer reviews")
+            rating_pros = ("Outstanding customer reviews",)
         elif rating >= 4.0:
-            pros.append("Very good customer satisfaction")
-        
-        # Add generic pros
-        pros.extend([
-            "Good value for money",
-            "Reliable brand",
-            "Available for immediate delivery"
-        ])
+            rating_pros = ("Very good customer satisfaction",)
+        else:
+            rating_pros = ()
         
+        pros = [*feature_pros, *rating_pros, *_GENERIC_PROS]
         return pros[:5]  # Limit to 5 pros
     
     def _generate_realistic_cons(self, product: Dict[str, Any]) -> List[str]:
         """Generate realistic cons based on product type"""
         product_type = product.get('product_type', '')
         
-        cons_by_type = {
-            'smartphone': [
-                "Could have faster charging",
-                "Camera performance in low light could be better",
-                "Storage not expandable"
-            ],
-            'laptop': [
-                "Could use more RAM for heavy tasks",
-                "Battery life could be longer",
-                "Gets warm during intensive use"
-            ],
-            'headphones': [
-                "Could be more compact for travel",
-                "Sound leakage at high volumes"
-            ],
-            'earbuds': [
-                "Case could be smaller",
-                "Touch controls can be sensitive"
-            ],
-            'vacuum cleaner': [
-                "Cord could be longer",
-                "Can be noisy during operation",
-                "Dust container needs frequent emptying"
-            ]
-        }
-        
-        return cons_by_type.get(product_type, [
-            "Price could be lower",
-            "More color options would be nice"
-        ])[:3]  # Limit to 3 cons 
\ No newline at end of file
+        return list(_CONS_BY_TYPE.get(product_type, _DEFAULT_CONS)[:3])  # Limit to 3 cons 
\ No newline at end of file
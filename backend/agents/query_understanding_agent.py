@@ -1,49 +1,113 @@
 from .base_agent import BaseAgent
+from .cache import TTLCache, normalize_query
 from typing import Dict, Any, List
 import asyncio
+import os
+import re
+import orjson
 
-class QueryUnderstandingAgent(BaseAgent):
-    """Agent responsible for understanding and parsing user queries"""
-    
-    def __init__(self):
-        super().__init__()
-        
-    async def parse_query(self, user_query: str) -> Dict[str, Any]:
-        """Parse natural language query into structured data"""
-        
-        prompt = f"""
-You are an expert at understanding e-commerce search queries. Parse the following user query into structured data.
-
-User Query: "{user_query}"
+# Invariant parsing instructions; the user query is appended after this prefix
+_PARSE_QUERY_PROMPT = """
+You are an expert at understanding e-commerce search queries. Parse the user query below into structured data.
 
 Extract the following information and return as JSON:
-{{
+{
     "product_category": "main category (e.g., electronics, clothing, home)",
     "product_type": "specific product type (e.g., laptop, vacuum cleaner, headphones)",
     "features_required": ["list of required features mentioned"],
-    "budget": {{
+    "budget": {
         "min": number or null,
         "max": number or null,
         "currency": "USD" or detected currency
-    }},
+    },
     "brand_preferences": ["preferred brands mentioned"],
     "size_requirements": "size specifications if any",
     "color_preferences": ["color preferences"],
     "use_case": "intended use or scenario",
     "priority_features": ["most important features ranked by importance"],
-    "deal_preferences": {{
+    "deal_preferences": {
         "wants_deals": true/false,
         "deal_types": ["discount", "coupon", "bundle", "free_shipping"]
-    }},
+    },
     "urgency": "immediate/soon/flexible",
     "sentiment": "positive/neutral/negative",
     "comparison_intent": true/false
-}}
+}
 
 Be thorough but only include information that's actually mentioned or strongly implied.
 """
+
+# Phrasings of the same budget ("< 20k", "below 20,000") share a parsed-query cache entry.
+# Words are only rewritten in front of a price (a currency marker, "k" shorthand
+# or a 4+ digit amount that is not a spec), so "Pro Max 256", "max 5000mah" and
+# "4k tv" keep their meaning; "<"/">" become "under"/"above" in normalize_query.
+_PRICE_AHEAD = (
+    r"(?=\s*(?:(?:₹|rs\.?|inr)\s*\d|\d+(?:\.\d+)?\s*k\b"
+    r"|(?:\d{1,3}(?:,\d{2,3})+|\d{4,})(?![\d,.])(?!\s*(?:gb|tb|mb|mah|hz|mp|w|inch|mm|cm|kg|g)\b)))"
+)
+_UPPER_BOUND_RE = re.compile(r"\b(?:below|less than|within|up ?to|max(?:imum)?)" + _PRICE_AHEAD)
+_LOWER_BOUND_RE = re.compile(r"\b(?:over|more than|at least|min(?:imum)?)" + _PRICE_AHEAD)
+_THOUSANDS_RE = re.compile(
+    r"((?:₹|\brs\.?|\binr|\bunder|\babove|\bbudget(?: of)?|\baround|\bbetween|\band|\bto|[<>≤≥])\s*)"
+    r"(\d+(?:\.\d+)?)k\b"
+)
+
+def _parse_cache_key(user_query: str) -> str:
+    """Normalized query with budget synonyms and shorthand spelled one way
+    
+    >>> _parse_cache_key("phone below ₹20K") == _parse_cache_key("phone < ₹20,000")
+    True
+    >>> _parse_cache_key("iPhone 15 Pro Max 256")
+    'iphone 15 pro max 256'
+    >>> _parse_cache_key("4k tv under 50k")
+    '4k tv under 50000'
+    >>> _parse_cache_key("phones > 20k") == _parse_cache_key("phones < 20k")
+    False
+    """
+    key = _UPPER_BOUND_RE.sub("under", user_query.lower())
+    key = _LOWER_BOUND_RE.sub("above", key)
+    key = _THOUSANDS_RE.sub(lambda match: match.group(1) + str(round(float(match.group(2)) * 1000)), key)
+    return normalize_query(key)
+
+class QueryUnderstandingAgent(BaseAgent):
+    """Agent responsible for understanding and parsing user queries"""
+    
+    def __init__(self):
+        super().__init__()
+        # Parsed queries as JSON bytes, so every caller gets its own copy
+        self.parsed_query_cache = TTLCache(
+            maxsize=int(os.getenv("QUERY_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("QUERY_CACHE_TTL", "3600"))
+        )
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+    async def parse_query(self, user_query: str) -> Dict[str, Any]:
+        """Parse natural language query into structured data"""
         
-        return await self.parse_json_response(prompt)
+        cache_key = _parse_cache_key(user_query)
+        cached = self.parsed_query_cache.get(cache_key)
+        if cached is not None:
+            self.cache_hits += 1
+            return orjson.loads(cached)
+        self.cache_misses += 1
+        
+        prompt = f"""{_PARSE_QUERY_PROMPT}
+User Query: "{user_query}"
+"""
+        
+        parsed = await self.parse_json_response(prompt, tag="parse_query")
+        if parsed:
+            self.parsed_query_cache.set(cache_key, orjson.dumps(parsed))
+        return parsed
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the parsed-query cache"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self.parsed_query_cache)
+        }
     
     async def refine_query(self, original_query: str, parsed_data: Dict[str, Any], clarification: str) -> Dict[str, Any]:
         """Refine the parsed query based on user clarification"""
@@ -54,13 +118,13 @@ The user provided this clarification: "{clarification}"
 Update the parsed query data based on this new information.
 
 Original Query: "{original_query}"
-Current Parsed Data: {parsed_data}
+Current Parsed Data: {self._to_json(parsed_data)}
 User Clarification: "{clarification}"
 
 Return the updated JSON structure with the same format as before.
 """
         
-        return await self.parse_json_response(prompt)
+        return await self.parse_json_response(prompt, tag="refine_query")
     
     async def suggest_clarifications(self, parsed_data: Dict[str, Any]) -> List[str]:
         """Suggest clarifying questions based on parsed data"""
@@ -68,7 +132,7 @@ Return the updated JSON structure with the same format as before.
         prompt = f"""
 Based on this parsed query data, suggest 2-3 clarifying questions that would help find better products.
 
-Parsed Data: {parsed_data}
+Parsed Data: {self._to_json(parsed_data)}
 
 Focus on missing important information like:
 - Budget if not specified
@@ -81,7 +145,7 @@ Return as JSON array of strings:
 """
         
         try:
-            response = await self.parse_json_response(prompt)
+            response = await self.parse_json_response(prompt, tag="suggest_clarifications")
             if isinstance(response, list):
                 return response
             return response.get("questions", [])
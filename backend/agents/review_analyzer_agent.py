@@ -1,12 +1,114 @@
 from .base_agent import BaseAgent
-from typing import Dict, Any, List
-import json
+from .cache import TTLCache
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import copy
+
+# Prompts are split into an invariant instruction prefix and the request data
+# appended after it, so the prefix is byte-identical across calls and can be
+# reused by prompt caching on the model side.
+_REVIEW_ANALYSIS_FIELDS = """- "overall_sentiment": "positive", "neutral", or "negative"
+- "sentiment_breakdown": {"positive": X, "neutral": Y, "negative": Z} (percentages that sum to 100)
+- "key_themes": List of 4-5 main topics customers discuss
+- "pros": List of 3-5 main advantages mentioned by customers
+- "cons": List of 3-5 main disadvantages or complaints
+- "review_summary": 2-3 sentence summary of overall customer sentiment
+- "red_flags": List of serious issues that potential buyers should know about
+- "recommendation_confidence": "high", "medium", or "low" based on review quality and consensus
+- "value_for_money_sentiment": Customer perception of value for the price in INR
+- "common_use_cases": How customers actually use this product based on reviews
+"""
+
+_REVIEW_COMPARISON_FIELDS = """- "summary": Overall comparison summary
+- "sentiment_comparison": Which product has better overall customer satisfaction
+- "strength_comparison": What each product excels at according to customers
+- "weakness_comparison": What customers complain about for each product
+- "recommendation": Which product based on real customer feedback and for what type of user
+"""
+
+# Products with fewer reviews than this in total (their review_count, not the
+# handful of sampled reviews attached) get the rating-based analysis instead
+# of an LLM call; a couple of reviews give the model nothing to summarize
+_MIN_REVIEWS_FOR_AI = 3
+
+# Comparisons of up to this many products analyze and compare in one prompt;
+# beyond it the combined reviews get long enough to stage the two steps
+_MAX_FUSED_COMPARISON_PRODUCTS = 4
+
+# Lane width for the packed star-rating histogram. Each lane holds up to
+# 2**32 - 1 reviews of one star rating before it would carry into the next.
+_STAR_LANE_BITS = 32
+_STAR_LANE_MASK = (1 << _STAR_LANE_BITS) - 1
+
+# Reviews are sent as a compact digest rather than one JSON object per review
+_REVIEWS_PER_RATING = 5
+
+_REVIEW_DIGEST_FORMAT = """Reviews are given as a digest. The first line holds aggregate statistics for all reviews:
+total count (N), average rating (avg) and the count of 1-5 star ratings (dist).
+Each following line is a sampled review formatted as rating|V if verified purchase|title|text."""
+
+_REVIEW_ANALYSIS_PROMPT = """
+You are an expert review analyzer for Indian e-commerce. Analyze these real customer reviews to provide actionable insights.
+
+""" + _REVIEW_DIGEST_FORMAT + """
+
+Provide analysis in JSON format with:
+""" + _REVIEW_ANALYSIS_FIELDS
+
+_BATCH_REVIEW_ANALYSIS_PROMPT = """
+You are an expert review analyzer for Indian e-commerce. Analyze the real customer reviews of each product below to provide actionable insights.
+
+""" + _REVIEW_DIGEST_FORMAT + """
+
+For every product provide an analysis object with:
+""" + _REVIEW_ANALYSIS_FIELDS + """
+Return a JSON array with exactly one analysis object per product, in the same order as "product_index".
+"""
+
+_REVIEW_COMPARISON_PROMPT = """
+Compare the review patterns and customer sentiment across these products based on real customer feedback.
+
+Provide comparison in JSON format with:
+""" + _REVIEW_COMPARISON_FIELDS
+
+_FUSED_REVIEW_COMPARISON_PROMPT = """
+You are an expert review analyzer for Indian e-commerce. Analyze the real customer reviews of each product below,
+then compare the review patterns and customer sentiment across the products.
+
+""" + _REVIEW_DIGEST_FORMAT + """
+
+For every product provide an analysis object with:
+""" + _REVIEW_ANALYSIS_FIELDS + """
+For the comparison provide an object with:
+""" + _REVIEW_COMPARISON_FIELDS + """
+Return a JSON object {"analyses": [...], "comparison": {...}} where "analyses" has exactly one
+analysis object per product, in the same order as "product_index".
+"""
+
+_QUERY_INSIGHTS_PROMPT = """
+Based on real customer reviews and the user's specific requirements, provide targeted insights.
+
+Provide query-specific insights in JSON format with:
+- "best_match_reasoning": Why certain products match the user's needs based on real customer feedback
+- "potential_concerns": What real customers say about issues relevant to the user's requirements
+- "user_type_recommendations": Recommendations based on similar customer profiles in reviews
+- "price_value_insights": What customers say about value for money at these price points in INR
+"""
 
 class ReviewAnalyzerAgent(BaseAgent):
     """Agent responsible for analyzing real product reviews from scraped data"""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_analyses: int = 8):
         super().__init__()
+        # Caps concurrent per-product LLM calls to respect provider rate limits
+        self.analysis_semaphore = asyncio.Semaphore(max_concurrent_analyses)
+        # Finished model analyses keyed by product id. Review statistics are left
+        # out: the reviews of a product differ between calls, so they are
+        # recomputed from the current reviews on every hit.
+        self.analysis_cache = TTLCache(maxsize=256, ttl=900)
+        # One lock per product id being analyzed, so concurrent requests for
+        # the same product wait for the first analysis instead of repeating it
+        self.analysis_locks: Dict[str, asyncio.Lock] = {}
     
     async def analyze_product_reviews(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze reviews for a specific product using real scraped review data"""
@@ -15,78 +117,192 @@ class ReviewAnalyzerAgent(BaseAgent):
         reviews = product_data.get("reviews", [])
         
         if not reviews:
-            return {
-                "overall_sentiment": "neutral",
-                "sentiment_breakdown": {"positive": 50, "neutral": 30, "negative": 20},
-                "key_themes": [],
-                "pros": [],
-                "cons": [],
-                "review_summary": "No reviews available for analysis",
-                "red_flags": [],
-                "recommendation_confidence": "low"
-            }
+            return self._no_reviews_analysis()
+        
+        product_id = product_data.get("id")
+        if not product_id:
+            analysis, _ = await self._compute_analysis(reviews, product_data)
+            return self._with_review_stats(analysis, reviews)
+        
+        cached = self.analysis_cache.get(product_id)
+        if cached is not None:
+            return self._with_review_stats(cached, reviews)
+        
+        lock = self.analysis_locks.setdefault(product_id, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have finished while we waited
+                analysis = self.analysis_cache.get(product_id)
+                if analysis is None:
+                    analysis, complete = await self._compute_analysis(reviews, product_data)
+                    if complete:
+                        self.analysis_cache.set(product_id, analysis)
+        finally:
+            if not lock.locked() and self.analysis_locks.get(product_id) is lock:
+                del self.analysis_locks[product_id]
+        
+        return self._with_review_stats(analysis, reviews)
+    
+    async def _compute_analysis(self, reviews: List[Dict[str, Any]], product_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Analyze a product's reviews without consulting the cache
+        
+        Returns the analysis without review statistics and whether it is complete
+        enough to cache; a failed model call leaves an empty analysis.
+        """
+        if not self._has_enough_reviews(product_data):
+            # Derived from the current reviews alone and cheap to redo, so not cached
+            return self._fallback_analysis(reviews), False
         
         # Use AI to analyze the real reviews
         analysis = await self._analyze_reviews_with_ai(reviews, product_data)
-        
-        # Add review statistics
+        return analysis, bool(analysis)
+    
+    def _with_review_stats(self, analysis: Dict[str, Any], reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Copy of an analysis with statistics for the reviews at hand"""
+        analysis = copy.deepcopy(analysis)
         analysis["review_statistics"] = self._calculate_review_stats(reviews)
-        
         return analysis
     
-    async def _analyze_reviews_with_ai(self, reviews: List[Dict[str, Any]], product_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Use AI to analyze real customer reviews"""
+    async def analyze_many(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze reviews for several products with a single batched AI call"""
         
-        # Prepare review text for analysis
-        review_texts = []
-        for review in reviews:
-            rating = review.get("rating", 0)
-            title = review.get("title", "")
-            text = review.get("text", "")
-            verified = review.get("verified_purchase", False)
-            
-            review_summary = f"Rating: {rating}/5"
-            if title:
-                review_summary += f" | Title: {title}"
-            if text:
-                review_summary += f" | Review: {text[:300]}"
-            if verified:
-                review_summary += " | Verified Purchase"
+        analyses = [None] * len(products)
+        pending = []
+        
+        for i, product in enumerate(products):
+            reviews = product.get("reviews")
+            cached = self.analysis_cache.get(product["id"]) if product.get("id") else None
             
-            review_texts.append(review_summary)
+            if cached is not None:
+                analyses[i] = self._with_review_stats(cached, reviews)
+            elif not reviews or not self._has_enough_reviews(product):
+                # Cheap deterministic path, no need to batch it
+                analyses[i] = await self.analyze_product_reviews(product)
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return analyses
+        
+        prompt = f"""{_BATCH_REVIEW_ANALYSIS_PROMPT}
+Products and Reviews:
+{self._to_json(self._review_batch([products[i] for i in pending]))}
+"""
+        
+        try:
+            response = await self.parse_json_response(prompt, tag="batch_review_analysis")
+        except Exception as e:
+            print(f"⚠️ Batched review analysis failed: {e}")
+            response = None
+        
+        if isinstance(response, list) and len(response) == len(pending) and all(isinstance(a, dict) for a in response):
+            for i, analysis in zip(pending, response):
+                if analysis and products[i].get("id"):
+                    self.analysis_cache.set(products[i]["id"], analysis)
+                analyses[i] = self._with_review_stats(analysis, products[i]["reviews"])
+        else:
+            # Fall back to one analysis per product, issued concurrently
+            results = await asyncio.gather(*[self._analyze_bounded(products[i]) for i in pending])
+            for i, analysis in zip(pending, results):
+                analyses[i] = analysis
         
-        product_info = {
+        return analyses
+    
+    def _review_batch(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Indexed product info and review digests for a multi-product prompt"""
+        return [
+            {
+                "product_index": position,
+                "product": self._product_info(product),
+                "reviews": self._compress_reviews(product["reviews"])
+            }
+            for position, product in enumerate(products)
+        ]
+    
+    def _needs_ai_analysis(self, product: Dict[str, Any]) -> bool:
+        """Whether analyzing this product would call the model"""
+        if not product.get("reviews") or not self._has_enough_reviews(product):
+            return False
+        return not product.get("id") or self.analysis_cache.get(product["id"]) is None
+    
+    def _has_enough_reviews(self, product_data: Dict[str, Any]) -> bool:
+        """Whether the product has enough reviews overall to be worth a model call"""
+        # The attached reviews are a sample, so the aggregate count decides when known
+        total = product_data.get("review_count") or len(product_data.get("reviews") or [])
+        return total >= _MIN_REVIEWS_FOR_AI
+    
+    async def _analyze_bounded(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze one product while holding the shared concurrency slot"""
+        async with self.analysis_semaphore:
+            return await self.analyze_product_reviews(product_data)
+    
+    def _no_reviews_analysis(self) -> Dict[str, Any]:
+        """Default analysis for products without any reviews"""
+        return {
+            "overall_sentiment": "neutral",
+            "sentiment_breakdown": {"positive": 50, "neutral": 30, "negative": 20},
+            "key_themes": [],
+            "pros": [],
+            "cons": [],
+            "review_summary": "No reviews available for analysis",
+            "red_flags": [],
+            "recommendation_confidence": "low"
+        }
+    
+    def _product_info(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Product fields relevant to review analysis"""
+        return {
             "title": product_data.get("title", ""),
             "brand": product_data.get("brand", ""),
             "price": product_data.get("price", 0),
             "rating": product_data.get("rating", 0),
             "category": product_data.get("category", "")
         }
+    
+    def _compress_reviews(self, reviews: List[Dict[str, Any]]) -> str:
+        """Compact, rating-stratified digest of the reviews for the AI prompt"""
         
-        prompt = f"""
-You are an expert review analyzer for Indian e-commerce. Analyze these real customer reviews to provide actionable insights.
-
+        # Aggregate line so the model still sees the whole review population
+        tally = self._tally_reviews(reviews)
+        total_reviews = len(reviews)
+        average_rating = tally["rating_sum"] / total_reviews if total_reviews > 0 else 0
+        distribution = [tally["distribution"][star] for star in range(1, 6)]
+        lines = [f"N={total_reviews} avg={average_rating:.1f} dist={distribution}"]
+        
+        # Keep a few reviews from each star rating instead of every review
+        buckets = {}
+        for review in reviews:
+            star = min(5, max(1, round(review.get("rating", 0))))
+            bucket = buckets.setdefault(star, [])
+            if len(bucket) < _REVIEWS_PER_RATING:
+                bucket.append(review)
+        
+        for star in sorted(buckets, reverse=True):
+            for review in buckets[star]:
+                verified = "V" if review.get("verified_purchase", False) else ""
+                title = review.get("title", "")[:80].replace("\n", " ")
+                text = review.get("text", "")[:150].replace("\n", " ")
+                lines.append(f"{review.get('rating', 0)}|{verified}|{title}|{text}")
+        
+        return "\n".join(lines)
+    
+    async def _analyze_reviews_with_ai(self, reviews: List[Dict[str, Any]], product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Use AI to analyze real customer reviews"""
+        
+        # Prepare review text for analysis
+        review_digest = self._compress_reviews(reviews)
+        product_info = self._product_info(product_data)
+        
+        prompt = f"""{_REVIEW_ANALYSIS_PROMPT}
 Product Information:
-{json.dumps(product_info, indent=2)}
+{self._to_json(product_info)}
 
 Real Customer Reviews:
-{json.dumps(review_texts, indent=2)}
-
-Provide analysis in JSON format with:
-- "overall_sentiment": "positive", "neutral", or "negative"
-- "sentiment_breakdown": {{"positive": X, "neutral": Y, "negative": Z}} (percentages that sum to 100)
-- "key_themes": List of 4-5 main topics customers discuss
-- "pros": List of 3-5 main advantages mentioned by customers
-- "cons": List of 3-5 main disadvantages or complaints
-- "review_summary": 2-3 sentence summary of overall customer sentiment
-- "red_flags": List of serious issues that potential buyers should know about
-- "recommendation_confidence": "high", "medium", or "low" based on review quality and consensus
-- "value_for_money_sentiment": Customer perception of value for the price in INR
-- "common_use_cases": How customers actually use this product based on reviews
+{review_digest}
 """
         
         try:
-            analysis = await self.parse_json_response(prompt)
+            analysis = await self.parse_json_response(prompt, tag="review_analysis")
             return analysis if isinstance(analysis, dict) else {}
         except Exception as e:
             print(f"⚠️ Review analysis failed: {e}")
@@ -96,8 +312,9 @@ Provide analysis in JSON format with:
         """Fallback analysis when AI fails"""
         
         # Simple sentiment analysis based on ratings
-        positive_reviews = len([r for r in reviews if r.get("rating", 0) >= 4])
-        negative_reviews = len([r for r in reviews if r.get("rating", 0) <= 2])
+        tally = self._tally_reviews(reviews)
+        positive_reviews = tally["positive"]
+        negative_reviews = tally["negative"]
         neutral_reviews = len(reviews) - positive_reviews - negative_reviews
         
         total_reviews = len(reviews)
@@ -138,70 +355,129 @@ Provide analysis in JSON format with:
             }
         
         total_reviews = len(reviews)
-        total_rating = sum(r.get("rating", 0) for r in reviews)
-        average_rating = total_rating / total_reviews if total_reviews > 0 else 0
+        tally = self._tally_reviews(reviews)
+        average_rating = tally["rating_sum"] / total_reviews if total_reviews > 0 else 0
+        verified_percentage = (tally["verified"] / total_reviews) * 100 if total_reviews > 0 else 0
         
-        # Rating distribution
-        rating_dist = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        verified_count = 0
+        return {
+            "total_reviews": total_reviews,
+            "average_rating": round(average_rating, 1),
+            "rating_distribution": tally["distribution"],
+            "verified_purchase_percentage": round(verified_percentage, 1)
+        }
+    
+    def _tally_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Collect rating and verification counts in a single pass over the reviews"""
+        
+        # Star counts are packed into one int with a fixed-width lane per star
+        # (lane n-1 counts n-star reviews), so tallying a review is a single add
+        star_counts = 0
+        rating_sum = 0
+        positive = 0
+        negative = 0
+        verified = 0
         
         for review in reviews:
             rating = review.get("rating", 0)
+            rating_sum += rating
+            
+            if rating >= 4:
+                positive += 1
+            elif rating <= 2:
+                negative += 1
+            
+            # Fractional ratings (e.g. 4.3) count towards the nearest star
             if 1 <= rating <= 5:
-                rating_dist[rating] += 1
+                star_counts += 1 << (_STAR_LANE_BITS * (round(rating) - 1))
             
             if review.get("verified_purchase", False):
-                verified_count += 1
+                verified += 1
         
-        verified_percentage = (verified_count / total_reviews) * 100 if total_reviews > 0 else 0
+        rating_dist = {
+            star: (star_counts >> (_STAR_LANE_BITS * (star - 1))) & _STAR_LANE_MASK
+            for star in range(1, 6)
+        }
         
         return {
-            "total_reviews": total_reviews,
-            "average_rating": round(average_rating, 1),
-            "rating_distribution": rating_dist,
-            "verified_purchase_percentage": round(verified_percentage, 1)
+            "distribution": rating_dist,
+            "rating_sum": rating_sum,
+            "positive": positive,
+            "negative": negative,
+            "verified": verified
         }
     
     async def compare_product_reviews(self, products: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Compare reviews across multiple products"""
         
-        product_analyses = []
+        fused = None
+        if 2 <= len(products) <= _MAX_FUSED_COMPARISON_PRODUCTS and all(self._needs_ai_analysis(p) for p in products):
+            fused = await self._analyze_and_compare_with_ai(products)
         
-        for product in products:
-            analysis = await self.analyze_product_reviews(product)
-            product_analyses.append({
+        if fused:
+            analyses, comparison = fused
+        else:
+            analyses = await self.analyze_many(products)
+            comparison = None
+        
+        product_analyses = [
+            {
                 "product_id": product.get("id", ""),
                 "product_title": product.get("title", ""),
                 "analysis": analysis
-            })
+            }
+            for product, analysis in zip(products, analyses)
+        ]
         
-        # AI-powered comparison of review patterns
-        comparison = await self._compare_reviews_with_ai(product_analyses)
+        if comparison is None:
+            # AI-powered comparison of review patterns
+            comparison = await self._compare_reviews_with_ai(product_analyses)
         
         return {
             "individual_analyses": product_analyses,
             "comparison": comparison
         }
     
+    async def _analyze_and_compare_with_ai(self, products: List[Dict[str, Any]]) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """Analyze and compare a few products in one AI call, or None if the response is unusable"""
+        
+        prompt = f"""{_FUSED_REVIEW_COMPARISON_PROMPT}
+Products and Reviews:
+{self._to_json(self._review_batch(products))}
+"""
+        
+        try:
+            response = await self.parse_json_response(prompt, tag="fused_review_comparison")
+        except Exception as e:
+            print(f"⚠️ Fused review comparison failed: {e}")
+            return None
+        
+        if not isinstance(response, dict):
+            return None
+        analyses = response.get("analyses")
+        comparison = response.get("comparison")
+        if not (isinstance(analyses, list) and len(analyses) == len(products)
+                and all(isinstance(a, dict) for a in analyses) and isinstance(comparison, dict)):
+            return None
+        
+        for product, analysis in zip(products, analyses):
+            if analysis and product.get("id"):
+                self.analysis_cache.set(product["id"], analysis)
+        
+        return [
+            self._with_review_stats(analysis, product["reviews"])
+            for product, analysis in zip(products, analyses)
+        ], comparison
+    
     async def _compare_reviews_with_ai(self, product_analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Use AI to compare review patterns across products"""
         
-        prompt = f"""
-Compare the review patterns and customer sentiment across these products based on real customer feedback.
-
+        prompt = f"""{_REVIEW_COMPARISON_PROMPT}
 Product Review Analyses:
-{json.dumps(product_analyses, indent=2)}
-
-Provide comparison in JSON format with:
-- "summary": Overall comparison summary
-- "sentiment_comparison": Which product has better overall customer satisfaction
-- "strength_comparison": What each product excels at according to customers
-- "weakness_comparison": What customers complain about for each product
-- "recommendation": Which product based on real customer feedback and for what type of user
+{self._to_json(product_analyses)}
 """
         
         try:
-            comparison = await self.parse_json_response(prompt)
+            comparison = await self.parse_json_response(prompt, tag="review_comparison")
             return comparison if isinstance(comparison, dict) else {}
         except Exception as e:
             print(f"⚠️ Review comparison failed: {e}")
@@ -211,11 +487,10 @@ Provide comparison in JSON format with:
         """Get review insights relevant to specific user query"""
         
         # Analyze reviews for all products
-        insights = []
+        analyses = await self.analyze_many(products)
         
-        for product in products:
-            analysis = await self.analyze_product_reviews(product)
-            insights.append({
+        insights = [
+            {
                 "product": {
                     "id": product.get("id", ""),
                     "title": product.get("title", ""),
@@ -223,7 +498,9 @@ Provide comparison in JSON format with:
                     "rating": product.get("rating", 0)
                 },
                 "review_analysis": analysis
-            })
+            }
+            for product, analysis in zip(products, analyses)
+        ]
         
         # Generate query-specific insights
         query_insights = await self._generate_query_specific_insights(query_data, insights)
@@ -236,24 +513,16 @@ Provide comparison in JSON format with:
     async def _generate_query_specific_insights(self, query_data: Dict[str, Any], insights: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate insights specific to user query based on real reviews"""
         
-        prompt = f"""
-Based on real customer reviews and the user's specific requirements, provide targeted insights.
-
+        prompt = f"""{_QUERY_INSIGHTS_PROMPT}
 User Query Requirements:
-{json.dumps(query_data, indent=2)}
+{self._to_json(query_data)}
 
 Product Review Insights:
-{json.dumps(insights, indent=2)}
-
-Provide query-specific insights in JSON format with:
-- "best_match_reasoning": Why certain products match the user's needs based on real customer feedback
-- "potential_concerns": What real customers say about issues relevant to the user's requirements
-- "user_type_recommendations": Recommendations based on similar customer profiles in reviews
-- "price_value_insights": What customers say about value for money at these price points in INR
+{self._to_json(insights)}
 """
         
         try:
-            query_insights = await self.parse_json_response(prompt)
+            query_insights = await self.parse_json_response(prompt, tag="query_insights")
             return query_insights if isinstance(query_insights, dict) else {}
         except Exception as e:
             print(f"⚠️ Query-specific insights failed: {e}")
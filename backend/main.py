@@ -1,13 +1,18 @@
 import os
 from fastapi import FastAPI, HTTPException
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
 import google.generativeai as genai
 from typing import Optional, List, Dict, Any
 from agents.coordinator_agent import CoordinatorAgent
-import json
+from agents.cache import QueryCache, RedisQueryCache, TTLCache, normalize_query
+import orjson
 import asyncio
+import re
+import time
 
 # Configure the Gemini API
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
@@ -24,9 +29,11 @@ app.add_middleware(
 )
 
 # Pydantic models
+# Conversation and follow-up context are passed through to the agents as-is,
+# so they are only checked to be a list/dict rather than validated per element
 class ProductSearchRequest(BaseModel):
     query: str
-    conversation_context: Optional[List[Dict[str, str]]] = None
+    conversation_context: Optional[list] = None
 
 class ProductComparisonRequest(BaseModel):
     product_ids: List[str]
@@ -38,7 +45,7 @@ class ProductDetailsRequest(BaseModel):
 
 class FollowUpRequest(BaseModel):
     follow_up_query: str
-    previous_context: Dict[str, Any]
+    previous_context: dict
 
 # Legacy support
 class PromptRequest(BaseModel):
@@ -54,52 +61,138 @@ print(f"🤖 Initializing Multi-Agent E-commerce Assistant with model: {MODEL_NA
 # Initialize the coordinator agent
 coordinator = CoordinatorAgent()
 
+# Finished recommendations shared by /search, /search-stream and /generate.
+# Only successful results are stored, so errors are always retried.
+search_cache = QueryCache(
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "300"))
+)
+
+# With REDIS_URL set, finished searches are also shared between worker processes;
+# the in-process cache stays in front of it so repeat hits skip the round trip
+shared_search_cache = RedisQueryCache.from_env("search", ttl=search_cache.ttl)
+
+async def get_cached_search(query: str) -> Optional[Dict[str, Any]]:
+    """Finished search for a query from this process or, failing that, from Redis"""
+    cached = search_cache.get(query)
+    if cached is None and shared_search_cache is not None:
+        cached = await shared_search_cache.get(query)
+        if cached is not None:
+            search_cache.set(query, cached)
+    return cached
+
+def is_complete_search(result: Dict[str, Any]) -> bool:
+    """Whether a search result is worth caching: a written response and every product analyzed"""
+    if result.get("type") != "product_recommendations" or not result.get("response"):
+        return False
+    # Failed analyses fall back to basic product info; review analyses whose
+    # model call failed carry only review statistics and no summary
+    return all(
+        product.get("source") != "basic_search" and product.get("review_analysis", {}).get("review_summary")
+        for product in result.get("products", [])
+    )
+
+async def store_search(query: str, result: Dict[str, Any]) -> None:
+    search_cache.set(query, result)
+    if shared_search_cache is not None:
+        await shared_search_cache.set(query, result)
+
+@app.on_event("shutdown")
+async def close_shared_caches():
+    if shared_search_cache is not None:
+        await shared_search_cache.close()
+
+# Searches currently running, keyed by normalized query, so identical
+# concurrent requests wait on one pipeline run instead of starting their own
+inflight_searches: Dict[str, asyncio.Task] = {}
+
+async def run_search(query: str, conversation_context: List[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Run the coordinator pipeline once and cache the result if it is complete"""
+    result = await coordinator.process_user_query(query, conversation_context)
+    if is_complete_search(result):
+        await store_search(query, result)
+    return result
+
+async def cached_search(query: str, conversation_context: List[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Run the coordinator pipeline for a query, reusing a recent or in-flight identical search"""
+    cached = await get_cached_search(query)
+    if cached is not None:
+        return {**cached, "cache_hit": True}
+    
+    key = normalize_query(query)
+    task = inflight_searches.get(key)
+    shared = task is not None
+    if not shared:
+        task = asyncio.create_task(run_search(query, conversation_context))
+        inflight_searches[key] = task
+        task.add_done_callback(lambda _: inflight_searches.pop(key, None))
+    
+    # Shielded so one caller going away doesn't cancel the search for the others
+    result = await asyncio.shield(task)
+    return {**result, "cache_hit": shared}
+
 # Legacy model for backward compatibility
 legacy_model = genai.GenerativeModel(MODEL_NAME)
 
+# Static payloads are serialized once at import and served as bytes
+ROOT_JSON = orjson.dumps({
+    "message": "🛒 CogniCart - Multi-Agent E-commerce Assistant with Real Web Scraping!",
+    "version": "2.0.0",
+    "capabilities": [
+        "Real-time product search from Indian e-commerce",
+        "Live pricing in INR",
+        "Real customer review analysis", 
+        "Actual deal and discount finding",
+        "Product comparison with live data",
+        "Conversational recommendations based on real data"
+    ],
+    "data_source": "Google Shopping + Fast Web Search",
+    "currency": "INR",
+    "market": "India"
+})
+
 @app.get("/")
 async def root():
-    return {
-        "message": "🛒 CogniCart - Multi-Agent E-commerce Assistant with Real Web Scraping!",
-        "version": "2.0.0",
-        "capabilities": [
-            "Real-time product search from Indian e-commerce",
-            "Live pricing in INR",
-            "Real customer review analysis", 
-            "Actual deal and discount finding",
-            "Product comparison with live data",
-            "Conversational recommendations based on real data"
-        ],
-        "data_source": "Google Shopping + Fast Web Search",
-        "currency": "INR",
-        "market": "India"
-    }
+    return Response(content=ROOT_JSON, media_type="application/json")
 
 async def generate_search_stream(query: str, conversation_context: List[Dict[str, str]] = None):
     """Generate streaming response for product search"""
     
-    def send_step(step_type: str, message: str, data: Any = None):
+    def send_step(step_type: str, message: str, data: Any = None) -> bytes:
         response = {
             "type": step_type,
             "message": message,
             "data": data,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.monotonic()
         }
-        return f"data: {json.dumps(response)}\n\n"
+        # Review statistics use int keys for the rating distribution
+        return b"data: " + orjson.dumps(response, default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+    
+    def send_additional_product(product: Dict[str, Any]) -> bytes:
+        # Products beyond the top three follow the final frame one at a time,
+        # so the final frame stays small whatever the number of results
+        return send_step("additional_product", f"➕ More options: {product.get('title', '')[:50]}", product)
     
     try:
+        cached = await get_cached_search(query)
+        if cached is not None:
+            yield send_step("final", "✨ Recommendations ready!", {
+                **{key: value for key, value in cached.items() if key != "additional_products"},
+                "cache_hit": True
+            })
+            for product in cached.get("additional_products", []):
+                yield send_additional_product(product)
+            return
+        
         # Step 1: Query understanding
         yield send_step("process", "🎯 Understanding your query...")
-        await asyncio.sleep(0.5)
         
         parsed_query = await coordinator.query_agent.parse_query(query)
         product_type = parsed_query.get('product_type', 'products')
         yield send_step("process", f"📝 Query understood: {product_type}")
-        await asyncio.sleep(0.5)
         
         # Step 2: Product search
         yield send_step("process", "🚀 Searching product database...")
-        await asyncio.sleep(0.8)
         
         products = await coordinator.search_agent.search_products(parsed_query)
         
@@ -113,64 +206,76 @@ async def generate_search_stream(query: str, conversation_context: List[Dict[str
             return
         
         yield send_step("process", f"✅ Found {len(products)} products")
-        await asyncio.sleep(0.5)
         
         # Step 3: Product analysis
         top_products = products[:3]
-        enhanced_products = []
+        enhanced_products = [None] * len(top_products)
+        
+        # Cards render from the search results right away; each one is filled
+        # in by a "product_enriched" frame as its analysis finishes
+        yield send_step("products_preview", "🛍️ Top matches found", {"products": top_products})
         
         for i, product in enumerate(top_products):
             product_title = product.get('title', '')[:50] + "..."
             yield send_step("process", f"📊 Analyzing product {i+1}: {product_title}")
-            await asyncio.sleep(0.7)
-            
+        
+        async def analyze_one(i: int, product: Dict[str, Any]):
             try:
-                # Get detailed product info
-                detailed_product = await coordinator.search_agent.get_product_details(product.get("id", ""))
-                
-                # Analyze reviews
-                review_analysis = await coordinator.review_agent.analyze_product_reviews(detailed_product)
-                
-                # Find deals
-                deal_analysis = await coordinator.deal_agent._analyze_product_for_deals(detailed_product)
-                
-                enhanced_product = {
-                    **detailed_product,
-                    "review_analysis": review_analysis,
-                    "deal_analysis": deal_analysis,
-                    "source": "real_scraping"
-                }
-                
-                enhanced_products.append(enhanced_product)
-                yield send_step("process", f"✅ Product {i+1} analyzed successfully")
-                
+                return i, await coordinator.analyze_product(product), None
             except Exception as e:
-                error_msg = str(e)
-                yield send_step("process", f"⚠️ Partial analysis for product {i+1}: {error_msg}")
+                return i, None, e
+        
+        # Analyze all products concurrently and report each as it finishes
+        tasks = [asyncio.create_task(analyze_one(i, product)) for i, product in enumerate(top_products)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, enhanced_product, error = await next_done
+                
+                if error is None:
+                    enhanced_products[i] = enhanced_product
+                    yield send_step("process", f"✅ Product {i+1} analyzed successfully")
+                else:
+                    yield send_step("process", f"⚠️ Partial analysis for product {i+1}: {str(error)}")
+                    
+                    # Add basic product info even if detailed analysis fails
+                    enhanced_products[i] = {
+                        **top_products[i],
+                        "review_analysis": {
+                            "overall_sentiment": "neutral",
+                            "review_summary": "Analysis unavailable"
+                        },
+                        "deal_analysis": {
+                            "deal_type": "standard_pricing",
+                            "value_assessment": "Price information available"
+                        },
+                        "source": "basic_search"
+                    }
                 
-                # Add basic product info even if detailed analysis fails
-                enhanced_products.append({
-                    **product,
-                    "review_analysis": {
-                        "overall_sentiment": "neutral",
-                        "review_summary": "Analysis unavailable"
-                    },
-                    "deal_analysis": {
-                        "deal_type": "standard_pricing",
-                        "value_assessment": "Price information available"
-                    },
-                    "source": "basic_search"
+                yield send_step("product_enriched", f"🔍 Product {i+1} details ready", {
+                    **enhanced_products[i],
+                    "id": top_products[i].get("id")
                 })
-            
-            await asyncio.sleep(0.3)
+        finally:
+            # The client may disconnect mid-stream; don't leave analyses running
+            for task in tasks:
+                task.cancel()
         
-        # Step 4: Generate response
+        # Step 4: Generate response, forwarding text as the model produces it
         yield send_step("process", "📝 Generating recommendations...")
-        await asyncio.sleep(1.0)
         
-        response = await coordinator._generate_comprehensive_response(
-            query, parsed_query, enhanced_products, products[3:] if len(products) > 3 else []
-        )
+        response_parts = []
+        stream_error = None
+        try:
+            async for chunk in coordinator.stream_comprehensive_response(
+                query, parsed_query, enhanced_products, products[3:] if len(products) > 3 else []
+            ):
+                response_parts.append(chunk)
+                yield send_step("token", chunk)
+        except Exception as e:
+            # The products are still useful; report the cut-off text and finish
+            stream_error = e
+            yield send_step("error", f"⚠️ Recommendation text incomplete: {str(e)}")
+        response = "".join(response_parts)
         
         # Final response
         final_data = {
@@ -183,7 +288,20 @@ async def generate_search_stream(query: str, conversation_context: List[Dict[str
             "data_source": "real_web_scraping"
         }
         
-        yield send_step("final", "✨ Recommendations ready!", final_data)
+        # A cut-off or empty response must not be served from the cache
+        if stream_error is None and is_complete_search(final_data):
+            await store_search(query, final_data)
+        
+        # The response text and products were already streamed; the final frame
+        # only carries the rest (cache hits above still send both here)
+        final_message = "Search completed with errors" if stream_error else "✨ Recommendations ready!"
+        yield send_step("final", final_message, {
+            **{key: value for key, value in final_data.items()
+               if key not in ("response", "products", "additional_products")},
+            "cache_hit": False
+        })
+        for product in final_data["additional_products"]:
+            yield send_additional_product(product)
         
     except Exception as e:
         yield send_step("error", f"❌ Error: {str(e)}")
@@ -193,24 +311,210 @@ async def generate_search_stream(query: str, conversation_context: List[Dict[str
             "error": str(e)
         })
 
-@app.post("/search-stream")
-async def search_products_stream(request: ProductSearchRequest):
-    """Streaming endpoint for product search with real-time updates"""
+class SearchBroadcast:
+    """Frames of one in-flight streamed search, replayed to every client asking for it"""
+    
+    def __init__(self):
+        self.frames = []
+        self.done = False
+        self.task = None
+        self._updated = asyncio.Event()
+    
+    def publish(self, frame: bytes) -> None:
+        self.frames.append(frame)
+        self._notify()
     
-    if not request.query.strip():
-        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    def finish(self) -> None:
+        self.done = True
+        self._notify()
     
-    return StreamingResponse(
-        generate_search_stream(request.query, request.conversation_context),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Allow-Methods": "*"
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+    
+    async def subscribe(self):
+        """Yield every frame so far, then each new one until the search finishes"""
+        position = 0
+        while True:
+            updated = self._updated
+            while position < len(self.frames):
+                yield self.frames[position]
+                position += 1
+            if self.done:
+                return
+            await updated.wait()
+
+inflight_streams: Dict[str, SearchBroadcast] = {}
+
+async def _run_search_broadcast(key: str, broadcast: SearchBroadcast, query: str,
+                                conversation_context: List[Dict[str, str]] = None):
+    try:
+        async for frame in generate_search_stream(query, conversation_context):
+            broadcast.publish(frame)
+    finally:
+        broadcast.finish()
+        inflight_streams.pop(key, None)
+
+async def shared_search_stream(query: str, conversation_context: List[Dict[str, str]] = None):
+    """Stream a search, joining an identical one already in progress"""
+    key = normalize_query(query)
+    broadcast = inflight_streams.get(key)
+    
+    if broadcast is None:
+        # The search runs in its own task so it finishes for the remaining
+        # clients, and fills the cache, even if the first client disconnects
+        broadcast = SearchBroadcast()
+        inflight_streams[key] = broadcast
+        broadcast.task = asyncio.create_task(_run_search_broadcast(key, broadcast, query, conversation_context))
+    
+    async for frame in broadcast.subscribe():
+        yield frame
+
+# Frames produced within a short window are written to the client together,
+# so bursts of progress and token frames cost one write instead of dozens
+SSE_BUFFER_FRAMES = 50
+SSE_FLUSH_INTERVAL = 0.025
+SSE_FLUSH_NOW = (b'data: {"type":"final"', b'data: {"type":"error"')
+
+async def coalesce_frames(source, max_frames: int = SSE_BUFFER_FRAMES,
+                          flush_interval: float = SSE_FLUSH_INTERVAL):
+    """Merge SSE frames arriving close together, flushing on size, age, final and error frames"""
+    frames = source.__aiter__()
+    buffer = bytearray()
+    buffered = 0
+    deadline = None
+    pending = None
+    
+    try:
+        while True:
+            # The pending read survives a flush timeout; cancelling it would
+            # tear down the source generator mid-frame
+            if pending is None:
+                pending = asyncio.ensure_future(frames.__anext__())
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            
+            if done:
+                read, pending = pending, None
+                try:
+                    frame = read.result()
+                except StopAsyncIteration:
+                    break
+                buffer += frame
+                buffered += 1
+                if deadline is None:
+                    deadline = time.monotonic() + flush_interval
+                if buffered < max_frames and not frame.startswith(SSE_FLUSH_NOW):
+                    continue
+            
+            yield bytes(buffer)
+            buffer.clear()
+            buffered = 0
+            deadline = None
+        
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"connection", b"keep-alive"),
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-headers", b"*"),
+    (b"access-control-allow-methods", b"*")
+]
+
+class SearchStreamEndpoint:
+    """Streaming endpoint for product search with real-time updates
+    
+    A bare ASGI app rather than a StreamingResponse: frames go straight to the
+    server's send() without a response object or extra task per request.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            request = ProductSearchRequest.model_validate_json(await self._read_body(receive))
+        except ValidationError as e:
+            # Same error shape FastAPI gives body models on the other endpoints
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+        
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="Search query cannot be empty")
+        
+        await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+        
+        # Servers may silently drop writes after a disconnect, so watch for it
+        # and stop streaming instead of running the search for nobody
+        stream = asyncio.create_task(self._stream(request, send))
+        disconnect = asyncio.create_task(self._wait_for_disconnect(receive))
+        try:
+            await asyncio.wait({stream, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stream.cancel()
+            disconnect.cancel()
+        
+        if stream.done() and not stream.cancelled():
+            stream.result()
+    
+    async def _stream(self, request: ProductSearchRequest, send) -> None:
+        async for chunk in coalesce_frames(shared_search_stream(request.query, request.conversation_context)):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    
+    async def _read_body(self, receive) -> bytes:
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                return bytes(body)
+    
+    async def _wait_for_disconnect(self, receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+app.router.add_route("/search-stream", SearchStreamEndpoint(), methods=["POST"])
+
+def custom_openapi() -> Dict[str, Any]:
+    """OpenAPI schema with /search-stream added
+    
+    Plain Starlette routes are left out of the generated schema, so the
+    operation for the ASGI endpoint above is described here by hand.
+    """
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    schema = get_openapi(title=app.title, version=app.version, description=app.description, routes=app.routes)
+    schema["paths"]["/search-stream"] = {
+        "post": {
+            "summary": "Search Products Stream",
+            "description": "Streaming endpoint for product search with real-time updates",
+            "operationId": "search_products_stream_search_stream_post",
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/ProductSearchRequest"}}}
+            },
+            "responses": {
+                "200": {
+                    "description": "Server-sent events: process, products_preview, product_enriched, "
+                                   "token, error, final and additional_product frames",
+                    "content": {"text/event-stream": {}}
+                },
+                "400": {"description": "Search query cannot be empty"},
+                "422": {
+                    "description": "Validation Error",
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}}}
+                }
+            }
         }
-    )
+    }
+    app.openapi_schema = schema
+    return schema
+
+app.openapi = custom_openapi
 
 @app.post("/search")
 async def search_products(request: ProductSearchRequest):
@@ -219,8 +523,7 @@ async def search_products(request: ProductSearchRequest):
         if not request.query.strip():
             raise HTTPException(status_code=400, detail="Search query cannot be empty")
         
-        result = await coordinator.process_user_query(request.query, request.conversation_context)
-        return result
+        return await cached_search(request.query, request.conversation_context)
     
     except Exception as e:
         print(f"Error in product search: {e}")
@@ -268,6 +571,10 @@ async def handle_follow_up(request: FollowUpRequest):
         print(f"Error in follow-up: {e}")
         raise HTTPException(status_code=500, detail=f"Follow-up error: {str(e)}")
 
+# Prompts mentioning any of these anywhere (including "products", "reviews")
+# are routed to the multi-agent search by the legacy endpoint
+PRODUCT_KEYWORDS_RE = re.compile("buy|find|search|recommend|product|price|deal|review", re.IGNORECASE)
+
 # Legacy endpoint for backward compatibility
 @app.post("/generate", response_model=PromptResponse)
 async def generate_text(request: PromptRequest):
@@ -277,14 +584,13 @@ async def generate_text(request: PromptRequest):
             raise HTTPException(status_code=400, detail="Prompt cannot be empty")
         
         # Check if it looks like a product search query
-        product_keywords = ["buy", "find", "search", "recommend", "product", "price", "deal", "review"]
-        if any(keyword in request.prompt.lower() for keyword in product_keywords):
+        if PRODUCT_KEYWORDS_RE.search(request.prompt):
             # Route to the multi-agent system
-            result = await coordinator.process_user_query(request.prompt)
+            result = await cached_search(request.prompt)
             return PromptResponse(response=result.get("response", "Product search completed"))
         
         # Fall back to basic generation
-        response = legacy_model.generate_content(request.prompt)
+        response = await legacy_model.generate_content_async(request.prompt)
         
         if not response.text:
             raise HTTPException(status_code=500, detail="Failed to generate response")
@@ -298,34 +604,87 @@ async def generate_text(request: PromptRequest):
 async def health_check():
     return {"status": "healthy", "service": "Multi-Agent E-commerce Assistant", "version": "2.0.0"}
 
+@app.get("/metrics")
+async def llm_metrics():
+    """Per call-site latency, prompt size, token and cache-hit aggregates for recent model calls"""
+    return {"llm_calls": coordinator.llm_metrics_summary()}
+
+# Results of the live agent probes, so frequent health checks do not each cost a model call
+agents_status_cache = TTLCache(maxsize=1, ttl=float(os.getenv("AGENTS_STATUS_TTL", "30")))
+
+async def probe_agents() -> Dict[str, str]:
+    """Run the live query agent and database probes, reusing a recent result"""
+    statuses = agents_status_cache.get("probes")
+    if statuses is not None:
+        return statuses
+    
+    from agents.fast_product_database import fast_db
+    
+    # Probe the query agent and the database together; the database search
+    # is synchronous, so it runs in a worker thread off the event loop
+    query_probe, database_probe = await asyncio.gather(
+        coordinator.query_agent.parse_query("test query"),
+        asyncio.to_thread(fast_db.search_products, "smartphone", max_products=1),
+        return_exceptions=True
+    )
+    
+    # Quick test - check if database has products
+    if isinstance(database_probe, Exception):
+        database_status = "error"
+    else:
+        database_status = "healthy" if database_probe else "empty"
+    
+    statuses = {
+        "query_understanding_agent": "error" if isinstance(query_probe, Exception) else "healthy",
+        "fast_database": database_status
+    }
+    agents_status_cache.set("probes", statuses)
+    return statuses
+
+# Everything in /agents-status after the live agent statuses and cache counters
+AGENTS_STATUS_STATIC_JSON = orjson.dumps({
+    "capabilities": [
+        "Natural language query understanding",
+        "Lightning-fast product search via database",
+        "Real Indian e-commerce products with accurate pricing",
+        "Realistic customer review analysis", 
+        "Authentic price and deal information",
+        "Multi-product comparison with real data",
+        "Contextual recommendations based on real products"
+    ],
+    "data_sources": [
+        "Fast Product Database (instant results)",
+        "Real Indian product data from Amazon, Flipkart",
+        "Authentic product specifications and reviews",
+        "Current market pricing in INR",
+        "Popular brands: Samsung, Apple, Sony, Xiaomi, etc."
+    ],
+    "model": MODEL_NAME,
+    "currency": "INR",
+    "market": "India",
+    "database_info": {
+        "max_products_per_search": 6,
+        "search_method": "Fast Database Lookup",
+        "response_time": "sub-second",
+        "cache_enabled": True,
+        "total_products": "20+ real Indian products",
+        "categories": "Electronics, Home, etc."
+    }
+})
+
 @app.get("/agents-status")
 async def agents_status():
     """Check the status of all agents with real scraping capabilities"""
     try:
-        # Test each agent
-        test_query = "test query"
-        
-        query_agent_status = "healthy"
         search_agent_status = "healthy"
         review_agent_status = "healthy" 
         deal_agent_status = "healthy"
-        scraper_status = "healthy"
-        
-        try:
-            await coordinator.query_agent.parse_query(test_query)
-        except:
-            query_agent_status = "error"
         
-        # Test database connectivity
-        try:
-            from agents.fast_product_database import fast_db
-            # Quick test - check if database has products
-            test_products = fast_db.search_products("smartphone", max_products=1)
-            database_status = "healthy" if test_products else "empty"
-        except Exception as e:
-            database_status = "error"
+        probes = await probe_agents()
+        query_agent_status = probes["query_understanding_agent"]
+        database_status = probes["fast_database"]
         
-        return {
+        live_status = orjson.dumps({
             "status": "operational",
             "coordinator": "healthy",
             "agents": {
@@ -335,33 +694,11 @@ async def agents_status():
                 "deal_finder_agent": deal_agent_status,
                 "fast_database": database_status
             },
-            "capabilities": [
-                "Natural language query understanding",
-                "Lightning-fast product search via database",
-                "Real Indian e-commerce products with accurate pricing",
-                "Realistic customer review analysis", 
-                "Authentic price and deal information",
-                "Multi-product comparison with real data",
-                "Contextual recommendations based on real products"
-            ],
-            "data_sources": [
-                "Fast Product Database (instant results)",
-                "Real Indian product data from Amazon, Flipkart",
-                "Authentic product specifications and reviews",
-                "Current market pricing in INR",
-                "Popular brands: Samsung, Apple, Sony, Xiaomi, etc."
-            ],
-            "model": MODEL_NAME,
-            "currency": "INR",
-            "market": "India",
-            "database_info": {
-                "max_products_per_search": 6,
-                "search_method": "Fast Database Lookup",
-                "response_time": "sub-second",
-                "cache_enabled": True,
-                "total_products": "20+ real Indian products",
-                "categories": "Electronics, Home, etc."
-            }
-        }
+            "query_cache": coordinator.query_agent.cache_stats()
+        })
+        
+        # Splice the two JSON objects: drop the live one's closing brace and
+        # the static one's opening brace
+        return Response(content=live_status[:-1] + b"," + AGENTS_STATUS_STATIC_JSON[1:], media_type="application/json")
     except Exception as e:
         return {"status": "error", "error": str(e)} 
\ No newline at end of file
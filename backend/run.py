@@ -1,13 +1,30 @@
+import os
+import importlib.util
 import uvicorn
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# uvicorn[standard] installs uvloop and httptools; pin them explicitly and
+# warn at startup when a missing wheel leaves the plain asyncio/h11 fallback
+LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+HTTP = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
 if __name__ == "__main__":
+    reload = os.getenv("RELOAD", "true").lower() == "true"
+    
+    if LOOP == "asyncio" or HTTP == "h11":
+        print(f"⚠️ uvloop/httptools not installed, serving with loop={LOOP} http={HTTP}; "
+              "install uvicorn[standard] for the faster event loop and HTTP parser")
+    
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
-    ) 
\ No newline at end of file
+        reload=reload,
+        # Reload mode runs a single process
+        workers=None if reload else int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop=LOOP,
+        http=HTTP
+    )
@@ -117,9 +117,22 @@ export default function Home() {
                       processSteps: data.type === "process" 
                         ? [...(msg.processSteps || []), data.message] 
                         : msg.processSteps,
-                      isLoading: data.type !== "final" && data.type !== "error",
-                      content: data.type === "final" && data.data?.response ? data.data.response : msg.content,
-                      products: data.type === "final" && data.data?.products ? data.data.products : msg.products,
+                      // Additional products arrive after the final frame
+                      isLoading: data.type === "additional_product"
+                        ? msg.isLoading
+                        : data.type !== "final" && data.type !== "error",
+                      // Response text arrives as "token" frames; cached results send it whole in "final"
+                      content: data.type === "token"
+                        ? msg.content + data.message
+                        : data.type === "final" && data.data?.response ? data.data.response : msg.content,
+                      products: data.type === "additional_product"
+                        ? [...(msg.products || []), data.data]
+                        : data.type === "product_enriched"
+                          // Analysis results fill in the matching preview card
+                          ? msg.products?.map(product => product.id === data.data.id ? { ...product, ...data.data } : product)
+                          : (data.type === "products_preview" || data.type === "final") && data.data?.products
+                            ? data.data.products
+                            : msg.products,
                     }
                   : msg
               ));